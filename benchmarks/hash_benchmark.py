@@ -0,0 +1,220 @@
+"""Benchmark de HashStructure: funciones hash x estrategias de colisión x distribuciones.
+
+Uso:
+    python -m benchmarks.hash_benchmark --formato csv --salida resultados.csv
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import json
+import random
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional
+
+from models.common import key_range, sample_new_keys
+from models.hash import HashStructure
+from models.hash_strategies import COLLISION_STRATEGIES, HASH_FUNCTIONS
+
+
+HASH_FUNCS = list(HASH_FUNCTIONS)
+COLLISIONS = list(COLLISION_STRATEGIES)
+CAPACITIES = [10, 100, 1000, 10000]
+
+
+# Distribuciones de claves
+def keys_uniform(count: int, key_length: int, rng: random.Random) -> List[int]:
+    keys = sample_new_keys(key_length, [], count, rng)
+    rng.shuffle(keys)
+    return keys
+
+
+def keys_sequential(count: int, key_length: int, rng: random.Random) -> List[int]:
+    lo, hi = key_range(key_length)
+    start = rng.randint(lo, max(lo, hi - count + 1))
+    return list(range(start, min(start + count, hi + 1)))
+
+
+def keys_clustered(count: int, key_length: int, rng: random.Random, clusters: int = 5) -> List[int]:
+    # Varias corridas densas de claves consecutivas en puntos al azar del rango
+    lo, hi = key_range(key_length)
+    seen: set[int] = set()
+    keys: List[int] = []
+    per_cluster = max(1, -(-count // clusters))
+    while len(keys) < count and len(seen) < hi - lo + 1:
+        start = rng.randint(lo, hi)
+        for v in range(start, min(start + per_cluster, hi + 1)):
+            if v not in seen and len(keys) < count:
+                seen.add(v)
+                keys.append(v)
+    rng.shuffle(keys)
+    return keys
+
+
+def keys_shared_suffix(count: int, key_length: int, rng: random.Random, suffix_digits: int = 2) -> List[int]:
+    # Todas las claves terminan igual: el truncamiento solo ve unos pocos valores
+    suffix_digits = min(suffix_digits, key_length - 1)
+    if suffix_digits <= 0:
+        return keys_uniform(count, key_length, rng)
+    step = 10 ** suffix_digits
+    suffix = rng.randrange(step)
+    prefixes = sample_new_keys(key_length - suffix_digits, [], count, rng)
+    rng.shuffle(prefixes)
+    return [p * step + suffix for p in prefixes]
+
+
+DISTRIBUTIONS: Dict[str, Callable[[int, int, random.Random], List[int]]] = {
+    "uniforme": keys_uniform,
+    "secuencial": keys_sequential,
+    "agrupada": keys_clustered,
+    "sufijo_comun": keys_shared_suffix,
+}
+
+
+def _rate(ops: int, seconds: float) -> float:
+    return ops / seconds if seconds > 0 else float("inf")
+
+
+def _absent_keys(present: List[int], count: int, key_length: int, rng: random.Random) -> List[int]:
+    return sample_new_keys(key_length, sorted(present), count, rng)
+
+
+def run_case(
+    hash_func: str,
+    collision: str,
+    distribution: str,
+    capacity: int,
+    key_length: int,
+    load: float,
+    seed: int,
+) -> Dict[str, Any]:
+    rng = random.Random(seed)
+    count = max(1, int(capacity * load))
+    keys = DISTRIBUTIONS[distribution](count, key_length, rng)
+    absent = _absent_keys(keys, len(keys), key_length, rng)
+
+    structure = HashStructure(capacity, key_length, hash_func, collision, tombstone_threshold=None)
+    inserted: List[int] = []
+    failed = 0
+    t0 = time.perf_counter()
+    for k in keys:
+        try:
+            structure.insert(k)
+            inserted.append(k)
+        except ValueError:
+            failed += 1
+    t_insert = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    for k in inserted:
+        structure.find(k)
+    t_hit = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    for k in absent:
+        structure.find(k)
+    t_miss = time.perf_counter() - t0
+
+    stats = structure.stats()
+
+    to_delete = inserted[: len(inserted) // 2]
+    t0 = time.perf_counter()
+    for k in to_delete:
+        structure.delete(k)
+    t_delete = time.perf_counter() - t0
+
+    # Memoria: se reconstruye la tabla aparte para no mezclar tracemalloc con los tiempos
+    tracemalloc.start()
+    probe = HashStructure(capacity, key_length, hash_func, collision)
+    for k in inserted:
+        probe.insert(k)
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "hash_func": hash_func,
+        "colision": collision,
+        "distribucion": distribution,
+        "capacidad": capacity,
+        "longitud_clave": key_length,
+        "claves": len(keys),
+        "insertadas": len(inserted),
+        "fallidas": failed,
+        "insert_ops_s": _rate(len(keys), t_insert),
+        "find_hit_ops_s": _rate(len(inserted), t_hit),
+        "find_miss_ops_s": _rate(len(absent), t_miss),
+        "delete_ops_s": _rate(len(to_delete), t_delete),
+        "sondeo_exitosa_prom": stats["exitosa"]["promedio"],
+        "sondeo_exitosa_max": stats["exitosa"]["maximo"],
+        "sondeo_fallida_prom": stats["fallida"]["promedio"],
+        "sondeo_fallida_max": stats["fallida"]["maximo"],
+        "sesgo_max_por_posicion": stats["sesgo"]["max_por_posicion"],
+        "sesgo_coef_variacion": stats["sesgo"]["coef_variacion"],
+        "memoria_bytes": memory,
+    }
+
+
+def run_suite(
+    capacities: List[int],
+    key_length: int,
+    load: float,
+    seed: int,
+    hash_funcs: Optional[List[str]] = None,
+    collisions: Optional[List[str]] = None,
+    distributions: Optional[List[str]] = None,
+) -> List[Dict[str, Any]]:
+    results = []
+    for capacity in capacities:
+        for distribution in distributions or list(DISTRIBUTIONS):
+            for hash_func in hash_funcs or HASH_FUNCS:
+                for collision in collisions or COLLISIONS:
+                    results.append(
+                        run_case(hash_func, collision, distribution, capacity, key_length, load, seed)
+                    )
+    return results
+
+
+def write_results(results: List[Dict[str, Any]], fmt: str, out) -> None:
+    if fmt == "csv":
+        writer = csv.DictWriter(out, fieldnames=list(results[0]) if results else [])
+        writer.writeheader()
+        writer.writerows(results)
+    else:
+        json.dump(results, out, ensure_ascii=False, indent=2)
+        out.write("\n")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark de funciones hash y estrategias de colisión")
+    parser.add_argument("--capacidades", type=int, nargs="+", default=CAPACITIES)
+    parser.add_argument("--longitud", type=int, default=6, help="longitud de clave (1-9)")
+    parser.add_argument("--carga", type=float, default=0.7, help="fracción de la capacidad a llenar")
+    parser.add_argument("--semilla", type=int, default=1234)
+    parser.add_argument("--hash", dest="hash_funcs", nargs="+", choices=HASH_FUNCS)
+    parser.add_argument("--colision", dest="collisions", nargs="+", choices=COLLISIONS)
+    parser.add_argument("--distribucion", dest="distributions", nargs="+", choices=list(DISTRIBUTIONS))
+    parser.add_argument("--formato", choices=["json", "csv"], default="json")
+    parser.add_argument("--salida", help="archivo de salida (por defecto, stdout)")
+    args = parser.parse_args(argv)
+
+    results = run_suite(
+        args.capacidades,
+        args.longitud,
+        args.carga,
+        args.semilla,
+        args.hash_funcs,
+        args.collisions,
+        args.distributions,
+    )
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8", newline="") as f:
+            write_results(results, args.formato, f)
+    else:
+        write_results(results, args.formato, sys.stdout)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
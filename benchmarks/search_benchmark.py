@@ -0,0 +1,142 @@
+"""Benchmark de BinaryStructure: algoritmos de búsqueda x distribuciones de claves.
+
+Uso:
+    python -m benchmarks.search_benchmark --formato csv --salida busquedas.csv
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+from benchmarks.hash_benchmark import DISTRIBUTIONS, write_results
+from models.binary import BinaryStructure
+from models.common import capacity_limit, key_range
+from models.search import SEARCH_METHODS
+from models.storage import STORAGE_BACKENDS
+
+
+METHODS = list(SEARCH_METHODS)
+CAPACITIES = [1000, 100000, 1000000]
+
+
+def _rate(ops: int, seconds: float) -> float:
+    return ops / seconds if seconds > 0 else float("inf")
+
+
+def _measure(structure: BinaryStructure, keys: List[int]) -> Dict[str, float]:
+    probes: List[int] = []
+    structure.probe_hook = lambda _method, n: probes.append(n)
+    t0 = time.perf_counter()
+    for k in keys:
+        structure.find(k)
+    elapsed = time.perf_counter() - t0
+    structure.probe_hook = None
+    return {
+        "ops_s": _rate(len(keys), elapsed),
+        "sondeo_prom": sum(probes) / len(probes) if probes else 0.0,
+        "sondeo_max": max(probes, default=0),
+    }
+
+
+def run_case(
+    method: str,
+    distribution: str,
+    capacity: int,
+    key_length: int,
+    load: float,
+    seed: int,
+    queries: int,
+    storage: str,
+) -> Dict[str, Any]:
+    rng = random.Random(seed)
+    count = max(1, int(capacity * load))
+    keys = DISTRIBUTIONS[distribution](count, key_length, rng)
+    structure = BinaryStructure(
+        capacity,
+        key_length,
+        keys,
+        storage=storage,
+        large=capacity > capacity_limit(False),
+        search=method,
+    )
+    present = [rng.choice(keys) for _ in range(queries)]
+    # Consultas fallidas: valores al azar del rango que no están guardados
+    lo, hi = key_range(key_length)
+    stored = set(keys)
+    absent = [v for v in (rng.randint(lo, hi) for _ in range(queries)) if v not in stored]
+
+    hit = _measure(structure, present)
+    miss = _measure(structure, absent)
+    return {
+        "busqueda": method,
+        "distribucion": distribution,
+        "almacenamiento": storage,
+        "capacidad": capacity,
+        "longitud_clave": key_length,
+        "claves": len(structure.items),
+        "exitosa_ops_s": hit["ops_s"],
+        "exitosa_sondeo_prom": hit["sondeo_prom"],
+        "exitosa_sondeo_max": hit["sondeo_max"],
+        "fallida_ops_s": miss["ops_s"],
+        "fallida_sondeo_prom": miss["sondeo_prom"],
+        "fallida_sondeo_max": miss["sondeo_max"],
+    }
+
+
+def run_suite(
+    capacities: List[int],
+    key_length: int,
+    load: float,
+    seed: int,
+    queries: int,
+    storage: str,
+    methods: Optional[List[str]] = None,
+    distributions: Optional[List[str]] = None,
+) -> List[Dict[str, Any]]:
+    results = []
+    for capacity in capacities:
+        for distribution in distributions or list(DISTRIBUTIONS):
+            for method in methods or METHODS:
+                results.append(
+                    run_case(method, distribution, capacity, key_length, load, seed, queries, storage)
+                )
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark de algoritmos de búsqueda sobre claves ordenadas")
+    parser.add_argument("--capacidades", type=int, nargs="+", default=CAPACITIES)
+    parser.add_argument("--longitud", type=int, default=7, help="longitud de clave (1-9)")
+    parser.add_argument("--carga", type=float, default=0.5, help="fracción de la capacidad a llenar")
+    parser.add_argument("--semilla", type=int, default=1234)
+    parser.add_argument("--consultas", type=int, default=10000, help="búsquedas exitosas y fallidas por caso")
+    parser.add_argument("--almacenamiento", choices=list(STORAGE_BACKENDS), default="array")
+    parser.add_argument("--busqueda", dest="methods", nargs="+", choices=METHODS)
+    parser.add_argument("--distribucion", dest="distributions", nargs="+", choices=list(DISTRIBUTIONS))
+    parser.add_argument("--formato", choices=["json", "csv"], default="json")
+    parser.add_argument("--salida", help="archivo de salida (por defecto, stdout)")
+    args = parser.parse_args(argv)
+
+    results = run_suite(
+        args.capacidades,
+        args.longitud,
+        args.carga,
+        args.semilla,
+        args.consultas,
+        args.almacenamiento,
+        args.methods,
+        args.distributions,
+    )
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8", newline="") as f:
+            write_results(results, args.formato, f)
+    else:
+        write_results(results, args.formato, sys.stdout)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
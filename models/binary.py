@@ -1,141 +1,197 @@
 from __future__ import annotations
 
+from array import array
 from dataclasses import dataclass, field
 import json
-import bisect
 import random
-from typing import List, Dict, Any
-
-
-def _is_power_of_10(n: int) -> bool:
-    if n <= 0:
-        return False
-    while n % 10 == 0:
-        n //= 10
-    return n == 1
+from typing import Callable, Iterable, Dict, Any, Optional
+
+from .common import (
+    Snapshot,
+    capacity_limit,
+    checksum_matches,
+    drop_positions,
+    is_power_of_10,
+    json_indent,
+    keys_checksum,
+    merge_sorted,
+    restore_snapshot,
+    sample_new_keys,
+    sorted_batch,
+    splice_sorted,
+    take_snapshot,
+    validate_keys,
+)
+from .search import SEARCH_METHODS, search_keys
+from .storage import DEFAULT_STORAGE, KeyStorage, bisect_keys, copy_storage, make_storage
 
 
 @dataclass
 class BinaryStructure:
     capacity: int
     key_length: int
-    items: List[int] = field(default_factory=list)  # always sorted ascending
+    items: KeyStorage = field(default_factory=list)  # always sorted ascending
+    storage: str = DEFAULT_STORAGE  # 'lista' | 'array' | 'numpy' | 'bloques'
+    large: bool = False  # modo grande: capacidades hasta 10^7
+    search: str = "binaria"  # 'binaria' | 'interpolacion' | 'exponencial'
+    # Se llama con (algoritmo, sondeos) tras cada búsqueda; last_probes guarda el último valor
+    probe_hook: Optional[Callable[[str, int], None]] = field(default=None, repr=False, compare=False)
+    _last_probes: int = field(default=0, init=False, repr=False, compare=False)
+    _shared: bool = field(default=False, init=False, repr=False, compare=False)  # items compartido con un snapshot
+
+    _SNAPSHOT_FIELDS = ("capacity", "key_length", "items", "storage", "large", "search")
 
     def __post_init__(self):
         if not isinstance(self.capacity, int) or self.capacity <= 0:
             raise ValueError("Capacidad inválida")
-        if self.capacity > 10000 or not _is_power_of_10(self.capacity):
-            raise ValueError("La capacidad debe ser potencia de 10 y ≤ 10000")
+        limit = capacity_limit(self.large)
+        if self.capacity > limit or not is_power_of_10(self.capacity):
+            raise ValueError(f"La capacidad debe ser potencia de 10 y ≤ {limit}")
         if not (1 <= int(self.key_length) <= 9):
             raise ValueError("Longitud de clave inválida (1-9)")
-        # Ensure items sorted and valid
-        self.items.sort()
-        last = None
-        for x in self.items:
-            if not isinstance(x, int):
-                raise ValueError("Los datos deben ser enteros")
-            if len(str(abs(x))) != int(self.key_length):
-                raise ValueError("Clave con longitud no compatible")
-            if last is not None and x == last:
-                raise ValueError("Datos duplicados no permitidos")
-            last = x
-        if len(self.items) > self.capacity:
-            raise ValueError("'datos' excede la capacidad")
+        if self.search not in SEARCH_METHODS:
+            raise ValueError("Algoritmo de búsqueda no soportado")
+        ordered = validate_keys(self.items, self.key_length, self.capacity, ordered=True)
+        self.items = make_storage(ordered, self.storage)
 
     @property
     def is_full(self) -> bool:
         return len(self.items) >= self.capacity
 
+    # Snapshots con copia al escribir
+    def snapshot(self) -> Snapshot:
+        """Estado actual en O(1); la próxima escritura copia el almacenamiento."""
+        return take_snapshot(self, self._SNAPSHOT_FIELDS)
+
+    def restore(self, snapshot: Snapshot) -> None:
+        """Vuelve al estado de ``snapshot`` en O(1)."""
+        restore_snapshot(self, snapshot)
+
+    def _before_write(self) -> None:
+        if self._shared:
+            self.items = copy_storage(self.items)
+            self._shared = False
+
     def _valid_key(self, value: int) -> bool:
         return isinstance(value, int) and len(str(abs(value))) == int(self.key_length)
 
+    @property
+    def last_probes(self) -> int:
+        """Claves leídas por la última búsqueda (incluidas las de insert/delete)."""
+        return self._last_probes
+
+    def _search(self, value: int) -> int:
+        i, probes = search_keys(self.items, value, self.search)
+        self._last_probes = probes
+        if self.probe_hook is not None:
+            self.probe_hook(self.search, probes)
+        return i
+
     def insert(self, value: int) -> int:
         if self.is_full:
             raise ValueError("La estructura está llena")
         if not self._valid_key(value):
             raise ValueError("La clave no cumple la longitud configurada")
-        i = bisect.bisect_left(self.items, value)
+        i = self._search(value)
         if i < len(self.items) and self.items[i] == value:
             raise ValueError("La clave ya existe (duplicada)")
+        self._before_write()
         self.items.insert(i, value)
         return i
 
     def find(self, value: int) -> int:
-        i = bisect.bisect_left(self.items, value)
+        i = self._search(value)
         if i != len(self.items) and self.items[i] == value:
             return i
         return -1
 
     def delete(self, value: int) -> int:
-        i = bisect.bisect_left(self.items, value)
+        i = self._search(value)
         if i == len(self.items) or self.items[i] != value:
             raise ValueError("La clave no existe")
+        self._before_write()
         self.items.pop(i)
         return i
 
+    def insert_many(self, keys: Iterable[int]) -> int:
+        """Inserta un lote con una sola mezcla; si alguna clave falla no se inserta ninguna."""
+        batch = sorted_batch(keys, self.key_length)
+        if len(self.items) + len(batch) > self.capacity:
+            raise ValueError("El lote excede la capacidad disponible")
+        items = self.items
+        positions = [bisect_keys(items, v) for v in batch]
+        for v, i in zip(batch, positions):
+            if i < len(items) and items[i] == v:
+                raise ValueError(f"La clave {v} ya existe (duplicada)")
+        self.items = make_storage(splice_sorted(items, batch, positions), self.storage)
+        self._shared = False
+        return len(batch)
+
+    def delete_many(self, keys: Iterable[int]) -> int:
+        """Elimina un lote con una sola pasada; si alguna clave no existe no se elimina ninguna."""
+        batch = sorted_batch(keys, self.key_length)
+        items = self.items
+        positions = [bisect_keys(items, v) for v in batch]
+        for v, i in zip(batch, positions):
+            if i == len(items) or items[i] != v:
+                raise ValueError(f"La clave {v} no existe")
+        self.items = make_storage(drop_positions(items, positions), self.storage)
+        self._shared = False
+        return len(batch)
+
     def to_dict(self) -> Dict[str, Any]:
+        datos = list(self.items)
         return {
             "tipo": "binaria",
             "capacidad": self.capacity,
             "longitud_clave": int(self.key_length),
-            "datos": list(self.items),
+            "datos": datos,
+            "suma_control": keys_checksum(("binaria", self.capacity, int(self.key_length)), datos),
+            **({"modo_grande": True} if self.large else {}),
+            **({"busqueda": self.search} if self.search != "binaria" else {}),
         }
 
     def to_json(self) -> str:
-        return json.dumps(self.to_dict(), ensure_ascii=False, indent=2)
+        return json.dumps(self.to_dict(), ensure_ascii=False, indent=json_indent(self.large))
 
     @staticmethod
-    def from_dict(data: Dict[str, Any]) -> "BinaryStructure":
+    def from_dict(data: Dict[str, Any], trusted: bool = False) -> "BinaryStructure":
+        """Con ``trusted``, un archivo cuya 'suma_control' coincide se carga sin validar las claves."""
         if not isinstance(data, dict) or data.get("tipo") != "binaria":
             raise ValueError("Archivo incompatible: 'tipo' debe ser 'binaria'")
         capacidad = data.get("capacidad")
         klen = data.get("longitud_clave")
         datos = data.get("datos")
+        large = bool(data.get("modo_grande", False))
+        search = data.get("busqueda", "binaria")
         if not isinstance(capacidad, int) or capacidad <= 0:
             raise ValueError("Capacidad inválida en archivo")
-        if capacidad > 10000 or not _is_power_of_10(capacidad):
-            raise ValueError("Capacidad debe ser potencia de 10 y ≤ 10000")
+        limit = capacity_limit(large)
+        if capacidad > limit or not is_power_of_10(capacidad):
+            raise ValueError(f"Capacidad debe ser potencia de 10 y ≤ {limit}")
         if not isinstance(klen, int) or not (1 <= klen <= 9):
             raise ValueError("Longitud de clave inválida en archivo")
-        if not isinstance(datos, list):
+        if not isinstance(datos, (list, array)):  # array: formato binario
             raise ValueError("Estructura de datos inválida en archivo")
-        # Validate and sort
-        items = []
-        seen = set()
-        for x in datos:
-            if not isinstance(x, int):
-                raise ValueError("Los datos deben ser enteros")
-            if len(str(abs(x))) != klen:
-                raise ValueError("Clave con longitud no compatible")
-            if x in seen:
-                raise ValueError("Claves duplicadas en archivo")
-            seen.add(x)
-            items.append(x)
-        items.sort()
-        if len(items) > capacidad:
-            raise ValueError("'datos' excede la capacidad")
-        return BinaryStructure(capacidad, klen, items)
-
-    def generate_random(self, count: int) -> int:
+        if search not in SEARCH_METHODS:
+            raise ValueError("Algoritmo de búsqueda inválido en archivo")
+        if trusted and checksum_matches(data, ("binaria", capacidad, klen)):
+            structure = BinaryStructure(capacidad, klen, large=large, search=search)
+            structure.items = make_storage(datos, structure.storage)
+            return structure
+        # __post_init__ valida y ordena en una sola pasada
+        return BinaryStructure(capacidad, klen, datos, large=large, search=search)
+
+    def generate_random(self, count: int, seed: Optional[int] = None) -> int:
         if count <= 0:
             return 0
         remaining_capacity = self.capacity - len(self.items)
         if remaining_capacity <= 0:
             return 0
         to_add = min(count, remaining_capacity)
-        k = int(self.key_length)
-        min_val = 0 if k == 1 else 10 ** (k - 1)
-        max_val = 10 ** k - 1
-        existing = set(self.items)
-        added_vals = []
-        while len(added_vals) < to_add:
-            v = random.randint(min_val, max_val)
-            if v in existing:
-                continue
-            existing.add(v)
-            added_vals.append(v)
-        # Merge and sort
-        self.items.extend(added_vals)
-        self.items.sort()
+        added_vals = sample_new_keys(self.key_length, self.items, to_add, random.Random(seed))
+        # Single merge pass: both runs are already sorted (builds a new, unshared container)
+        self.items = make_storage(merge_sorted(self.items, added_vals), self.storage)
+        self._shared = False
         return len(added_vals)
 
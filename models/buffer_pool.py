@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from typing import Callable, Sequence, Set
+
+
+BlockLoader = Callable[[int], Sequence[int]]
+
+
+class BufferPool:
+    """Buffer de bloques con reemplazo LRU.
+
+    Guarda hasta ``capacity`` bloques leídos; pedir un bloque presente es un
+    acierto y no lee el almacenamiento. Los bloques modificados quedan sucios
+    y cuentan como una escritura al desalojarlos o en ``flush``. Con
+    capacidad 0 cada pedido es una lectura.
+    """
+
+    def __init__(self, capacity: int = 0):
+        self._blocks: "OrderedDict[int, Sequence[int]]" = OrderedDict()
+        self._dirty: Set[int] = set()
+        self.capacity = 0
+        self.resize(capacity)
+        self.reset_stats()
+
+    def __len__(self) -> int:
+        return len(self._blocks)
+
+    def __contains__(self, block: object) -> bool:
+        return block in self._blocks
+
+    def reset_stats(self) -> None:
+        self.hits = 0
+        self.misses = 0  # lecturas de bloque al almacenamiento
+        self.evictions = 0
+        self.writes = 0  # bloques sucios escritos de vuelta
+
+    @property
+    def dirty(self) -> int:
+        return len(self._dirty)
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def resize(self, capacity: int) -> None:
+        if not isinstance(capacity, int) or capacity < 0:
+            raise ValueError("Tamaño de buffer inválido (bloques ≥ 0)")
+        self.capacity = capacity
+        self._evict()
+
+    def _evict(self) -> None:
+        while len(self._blocks) > self.capacity:
+            block, _ = self._blocks.popitem(last=False)
+            self.evictions += 1
+            if block in self._dirty:
+                self._dirty.discard(block)
+                self.writes += 1
+
+    def get(self, block: int, load: BlockLoader) -> Sequence[int]:
+        """Contenido del bloque, leyéndolo con ``load`` solo si no está en el buffer."""
+        cached = self._blocks.get(block)
+        if cached is not None:
+            self.hits += 1
+            self._blocks.move_to_end(block)
+            return cached
+        self.misses += 1
+        data = load(block)
+        if self.capacity:
+            self._blocks[block] = data
+            self._evict()
+        return data
+
+    def update(self, first: int, load: BlockLoader) -> None:
+        """Tras una escritura desde el bloque ``first``: refresca los bloques
+        presentes a partir de él y los marca sucios (la copia del buffer es
+        la modificada, no se cuenta como lectura)."""
+        for block in [b for b in self._blocks if b >= first]:
+            data = load(block)
+            if data:
+                self._blocks[block] = data
+                self._dirty.add(block)
+            else:  # el bloque quedó vacío
+                del self._blocks[block]
+                self._dirty.discard(block)
+
+    def flush(self) -> int:
+        """Escribe los bloques sucios; devuelve cuántos eran."""
+        count = len(self._dirty)
+        self.writes += count
+        self._dirty.clear()
+        return count
+
+    def clear(self) -> None:
+        """Descarta el contenido (el almacenamiento fue reemplazado)."""
+        self._blocks.clear()
+        self._dirty.clear()
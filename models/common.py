@@ -0,0 +1,255 @@
+from __future__ import annotations
+
+from array import array
+import bisect
+from dataclasses import dataclass
+import heapq
+import json
+import random
+import sys
+from types import MappingProxyType
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple
+import zlib
+
+try:  # NumPy es opcional: acelera el muestreo de lotes grandes
+    import numpy as np
+except ImportError:  # pragma: no cover - depende del entorno
+    np = None
+
+
+# Desde este tamaño los muestreos y mezclas se hacen con NumPy (si está instalado)
+_VECTOR_SAMPLE = 4096
+
+# Límite de capacidad del modo normal (pensado para visualizar) y del modo grande.
+MAX_CAPACITY = 10000
+MAX_CAPACITY_LARGE = 10 ** 7
+
+
+def is_power_of_10(n: int) -> bool:
+    if n <= 0:
+        return False
+    while n % 10 == 0:
+        n //= 10
+    return n == 1
+
+
+def is_multiple_of_10(n: int) -> bool:
+    return n > 0 and n % 10 == 0
+
+
+def capacity_limit(large: bool) -> int:
+    return MAX_CAPACITY_LARGE if large else MAX_CAPACITY
+
+
+def json_indent(large: bool) -> int | None:
+    # En modo grande se escribe JSON compacto: una clave por línea no escala.
+    return None if large else 2
+
+
+def key_range(key_length: int) -> Tuple[int, int]:
+    k = int(key_length)
+    return (0 if k == 1 else 10 ** (k - 1)), 10 ** k - 1
+
+
+def validate_keys(values: Iterable[Any], key_length: int, capacity: int, ordered: bool = False) -> List[int]:
+    """Valida un conjunto de claves y lo devuelve como lista (ordenada si ``ordered``).
+
+    Cada criterio (tipo, longitud, cantidad, repetidos) es una sola pasada en
+    C: la longitud se comprueba por rango numérico con min/max en lugar de
+    convertir cada clave a texto.
+    """
+    keys = list(values)
+    if len(keys) > capacity:
+        raise ValueError("'datos' excede la capacidad")
+    if not all(isinstance(x, int) for x in keys):
+        raise ValueError("Los datos deben ser enteros")
+    if ordered:
+        keys.sort()
+    if keys:
+        lo, hi = key_range(key_length)
+        smallest, largest = (keys[0], keys[-1]) if ordered else (min(keys), max(keys))
+        if smallest < 0:
+            # Con negativos el rango de valores absolutos no sale de min/max
+            if not all(lo <= abs(x) <= hi for x in keys):
+                raise ValueError("Clave con longitud no compatible")
+        elif smallest < lo or largest > hi:
+            raise ValueError("Clave con longitud no compatible")
+    if ordered:
+        if any(a == b for a, b in zip(keys, keys[1:])):
+            raise ValueError("Claves duplicadas no permitidas")
+    elif len(set(keys)) != len(keys):
+        raise ValueError("Claves duplicadas no permitidas")
+    return keys
+
+
+def keys_checksum(header: Sequence[Any], keys: Iterable[int]) -> int:
+    """CRC32 de la cabecera y de las claves empaquetadas como int32 little-endian."""
+    data = array("i", keys)
+    if sys.byteorder == "big":
+        data.byteswap()
+    return zlib.crc32(data, zlib.crc32(json.dumps(list(header)).encode()))
+
+
+def checksum_matches(data: Dict[str, Any], header: Sequence[Any], keys: Optional[Iterable[int]] = None) -> bool:
+    """True si 'suma_control' corresponde a la cabecera y a 'datos' del archivo.
+
+    ``keys`` reemplaza a 'datos' cuando estos no son una lista de claves (tabla hash).
+    """
+    expected = data.get("suma_control")
+    if not isinstance(expected, int) or not isinstance(data.get("datos"), (list, array)):
+        return False
+    try:
+        return keys_checksum(header, data["datos"] if keys is None else keys) == expected
+    except (TypeError, OverflowError):
+        return False
+
+
+def sample_new_keys(
+    key_length: int,
+    existing_sorted: Sequence[int],
+    count: int,
+    rng: Optional[random.Random] = None,
+) -> List[int]:
+    """Extrae ``count`` claves distintas que no estén en ``existing_sorted``.
+
+    Se muestrean rangos del espacio libre (sin rechazo) y se traducen a claves
+    saltando las existentes, así que el costo no depende de qué tan llena esté
+    la estructura. El resultado sale ordenado.
+
+    Reproducibilidad: con la misma semilla en ``rng`` el resultado se repite
+    solo en el mismo entorno. Desde ``_VECTOR_SAMPLE`` claves, si NumPy está
+    instalado, se muestrea con un generador de NumPy sembrado desde ``rng``,
+    así que la misma semilla da otras claves con y sin NumPy (y pedir el
+    mismo total en lotes de otro tamaño también las cambia).
+    """
+    rng = rng or random.Random()
+    lo, hi = key_range(key_length)
+    start = bisect.bisect_left(existing_sorted, lo)
+    stop = bisect.bisect_right(existing_sorted, hi)
+    free = (hi - lo + 1) - (stop - start)
+    count = min(count, free)
+    if count <= 0:
+        return []
+    if np is not None and count >= _VECTOR_SAMPLE:
+        ranks = np.sort(_numpy_rng(rng).choice(free, count, replace=False))
+        taken = np.asarray(existing_sorted[start:stop], dtype=np.int64)
+        # Claves libres por debajo de cada existente: la clave de rango r se
+        # corre un lugar por cada existente que tiene a lo sumo r libres debajo
+        below = taken - lo - np.arange(len(taken))
+        return (lo + ranks + np.searchsorted(below, ranks, side="right")).tolist()
+    keys: List[int] = []
+    j = start
+    ranks = sorted(rng.sample(range(free), count))
+    if count * (stop - start).bit_length() < stop - start:
+        # Lote chico frente a las existentes: cada clave se ubica por bisección
+        # sobre la cantidad de libres por debajo de cada existente
+        for rank in ranks:
+            a, b = j, stop
+            while a < b:
+                m = (a + b) // 2
+                if existing_sorted[m] - lo - (m - start) <= rank:
+                    a = m + 1
+                else:
+                    b = m
+            j = a
+            keys.append(lo + rank + (j - start))
+        return keys
+    for rank in ranks:
+        value = lo + rank + (j - start)
+        while j < stop and existing_sorted[j] <= value:
+            j += 1
+            value += 1
+        keys.append(value)
+    return keys
+
+
+def _numpy_rng(rng: random.Random) -> Any:
+    # Generador de NumPy sembrado desde ``rng``: la misma semilla da el mismo
+    # resultado mientras NumPy esté disponible, pero no el mismo que ``rng``
+    return np.random.default_rng(rng.getrandbits(64))
+
+
+def shuffle_keys(keys: List[int], rng: random.Random) -> None:
+    """Como ``rng.shuffle``; con NumPy para listas grandes.
+
+    Desde ``_VECTOR_SAMPLE`` claves, si NumPy está instalado, la permutación
+    sale de un generador de NumPy sembrado desde ``rng``: con la misma
+    semilla el orden es otro que sin NumPy (ver ``sample_new_keys``).
+    """
+    if np is not None and len(keys) >= _VECTOR_SAMPLE:
+        keys[:] = np.asarray(keys, dtype=np.int64)[_numpy_rng(rng).permutation(len(keys))].tolist()
+    else:
+        rng.shuffle(keys)
+
+
+def merge_sorted(a: Iterable[int], b: Iterable[int]) -> Iterator[int]:
+    """Mezcla dos corridas ordenadas en una sola pasada."""
+    return heapq.merge(a, b)
+
+
+def sorted_batch(keys: Iterable[Any], key_length: int) -> List[int]:
+    """Lote de claves validado (tipo, longitud, sin repetidos) y ordenado."""
+    batch = list(keys)
+    klen = int(key_length)
+    for v in batch:
+        if not isinstance(v, int):
+            raise ValueError("Los datos deben ser enteros")
+        if len(str(abs(v))) != klen:
+            raise ValueError(f"La clave {v} no cumple la longitud configurada")
+    batch.sort()
+    for prev, v in zip(batch, batch[1:]):
+        if prev == v:
+            raise ValueError(f"La clave {v} está repetida en el lote")
+    return batch
+
+
+def splice_sorted(items: Sequence[int], batch: Sequence[int], positions: Sequence[int]) -> List[int]:
+    """``items`` con cada ``batch[i]`` insertada antes de ``positions[i]`` (no decrecientes).
+
+    Se copian tramos enteros entre posiciones, así el costo es O(n + k).
+    """
+    out: List[int] = []
+    prev = 0
+    for value, pos in zip(batch, positions):
+        out.extend(items[prev:pos])
+        out.append(value)
+        prev = pos
+    out.extend(items[prev:])
+    return out
+
+
+def drop_positions(items: Sequence[int], positions: Sequence[int]) -> List[int]:
+    """``items`` sin las posiciones indicadas (crecientes), en O(n + k)."""
+    out: List[int] = []
+    prev = 0
+    for pos in positions:
+        out.extend(items[prev:pos])
+        prev = pos + 1
+    out.extend(items[prev:])
+    return out
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    """Estado congelado de una estructura, creado por snapshot() y aplicado por restore().
+
+    Comparte el almacenamiento con la estructura: tanto la estructura como las
+    que se restauren desde aquí copian antes de su primera escritura, así que
+    el snapshot nunca cambia y crearlo o restaurarlo es O(1).
+    """
+
+    kind: type
+    state: Mapping[str, Any]
+
+
+def take_snapshot(obj: Any, fields: Sequence[str]) -> Snapshot:
+    obj._shared = True
+    return Snapshot(type(obj), MappingProxyType({name: getattr(obj, name) for name in fields}))
+
+
+def restore_snapshot(obj: Any, snapshot: Snapshot) -> None:
+    if not isinstance(obj, snapshot.kind):
+        raise ValueError("El snapshot corresponde a otro tipo de estructura")
+    for name, value in snapshot.state.items():
+        setattr(obj, name, value)
+    obj._shared = True
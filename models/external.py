@@ -1,15 +1,32 @@
 from __future__ import annotations
 
+from array import array
 from dataclasses import dataclass, field
 import bisect
 import json
 import math
 import random
-from typing import Any, Dict, List, Optional
-
-
-def _is_multiple_of_10(n: int) -> bool:
-    return n > 0 and n % 10 == 0
+from typing import Any, ClassVar, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .buffer_pool import BufferPool
+from .common import (
+    Snapshot,
+    capacity_limit,
+    checksum_matches,
+    drop_positions,
+    is_multiple_of_10,
+    json_indent,
+    key_range,
+    keys_checksum,
+    merge_sorted,
+    restore_snapshot,
+    sample_new_keys,
+    sorted_batch,
+    splice_sorted,
+    take_snapshot,
+    validate_keys,
+)
+from .storage import DEFAULT_STORAGE, BlockFile, KeyStorage, bisect_keys, copy_storage, make_storage
 
 
 @dataclass
@@ -24,51 +41,75 @@ class SearchResult:
         return cls(-1, block, -1, False)
 
 
+def _check_block_file(keys: BlockFile, key_length: int, capacity: int) -> None:
+    """Comprueba cantidad, rango y orden estricto de un archivo de bloques por tramos."""
+    if len(keys) > capacity:
+        raise ValueError("El archivo excede la capacidad")
+    lo, hi = key_range(key_length)
+    last: Optional[int] = None
+    for start in range(0, len(keys), BlockFile.CHUNK):
+        chunk = keys.read(start, start + BlockFile.CHUNK).tolist()
+        if min(map(abs, chunk)) < lo or max(map(abs, chunk)) > hi:
+            raise ValueError("Clave con longitud no compatible en el archivo")
+        # Ordenadas y sin repetidos <=> coincide con su conjunto ordenado
+        if (last is not None and chunk[0] <= last) or chunk != sorted(set(chunk)):
+            raise ValueError("Las claves del archivo deben estar ordenadas y sin repetidos")
+        last = chunk[-1]
+
+
 @dataclass
 class ExternalStructureBase:
     capacity: int
     key_length: int
-    items: List[int] = field(default_factory=list)
-    type_name: str = "externa"
+    items: KeyStorage = field(default_factory=list)
+    # Valor de 'tipo' en el JSON; cada subclase define el suyo (no es un campo del dataclass)
+    type_name: ClassVar[str] = "externa"
+    storage: str = DEFAULT_STORAGE  # 'lista' | 'array' | 'numpy' | 'bloques' | 'disco'
+    large: bool = False  # modo grande: capacidades hasta 10^7
+    buffer_blocks: int = 0  # bloques que retiene el buffer LRU (0: sin buffer)
+    _layout: tuple[int, int] = field(default=(1, 1), init=False, repr=False, compare=False)
+    _shared: bool = field(default=False, init=False, repr=False, compare=False)  # items compartido con un snapshot
+    _pool: BufferPool = field(default_factory=BufferPool, init=False, repr=False, compare=False)
+    # Lecturas de bloque y aciertos del buffer de la última búsqueda
+    _last_reads: int = field(default=0, init=False, repr=False, compare=False)
+    _last_hits: int = field(default=0, init=False, repr=False, compare=False)
+
+    _SNAPSHOT_FIELDS = ("capacity", "key_length", "items", "storage", "large", "_layout")
 
     def __post_init__(self):
         if not isinstance(self.capacity, int) or self.capacity <= 0:
             raise ValueError("Capacidad inválida")
-        if self.capacity > 10000 or not _is_multiple_of_10(self.capacity):
-            raise ValueError("La capacidad debe ser múltiplo de 10 y ≤ 10000")
+        limit = capacity_limit(self.large)
+        if self.capacity > limit or not is_multiple_of_10(self.capacity):
+            raise ValueError(f"La capacidad debe ser múltiplo de 10 y ≤ {limit}")
         if not (1 <= int(self.key_length) <= 9):
             raise ValueError("Longitud de clave inválida (1-9)")
+        self._layout = self._compute_block_layout()
+        self._pool = BufferPool(self.buffer_blocks)
         # Normalizar datos iniciales
-        cleaned: List[int] = []
-        seen = set()
-        for value in sorted(self.items):
-            if not isinstance(value, int):
-                raise ValueError("Los datos deben ser enteros")
-            if len(str(abs(value))) != int(self.key_length):
-                raise ValueError("Clave con longitud no compatible")
-            if value in seen:
-                raise ValueError("Claves duplicadas no permitidas")
-            cleaned.append(value)
-            seen.add(value)
-        if len(cleaned) > self.capacity:
-            raise ValueError("'datos' excede la capacidad")
-        self.items = cleaned
+        cleaned = validate_keys(self.items, self.key_length, self.capacity, ordered=True)
+        self.items = make_storage(cleaned, self.storage)
 
     # Propiedades de bloques
     @property
     def block_size(self) -> int:
-        size, _ = self._compute_block_layout()
+        size, _ = self._layout
         return size
 
     @property
     def block_count(self) -> int:
-        _, count = self._compute_block_layout()
+        _, count = self._layout
         return count
 
     def _compute_block_layout(self) -> tuple[int, int]:
         sqrt_size = math.isqrt(self.capacity)
         if sqrt_size > 0 and self.capacity % sqrt_size == 0:
             return sqrt_size, self.capacity // sqrt_size
+        if self.large:
+            # Con capacidades grandes 10 bloques serían enormes: se usa el
+            # mayor divisor de la capacidad que no supere la raíz.
+            size = next(d for d in range(sqrt_size, 0, -1) if self.capacity % d == 0)
+            return size, self.capacity // size
         block_size = max(1, self.capacity // 10)
         return block_size, 10
 
@@ -83,28 +124,72 @@ class ExternalStructureBase:
         offset = index % self.block_size
         return block, offset
 
-    def get_blocks(self, fill: bool = True) -> List[List[Optional[int]]]:
-        blocks: List[List[Optional[int]]] = []
+    # Buffer y lecturas de bloque
+    @property
+    def buffer(self) -> BufferPool:
+        return self._pool
+
+    @property
+    def block_reads(self) -> int:
+        return self._pool.misses
+
+    @property
+    def last_reads(self) -> int:
+        """Bloques leídos del almacenamiento por la última búsqueda."""
+        return self._last_reads
+
+    @property
+    def last_hits(self) -> int:
+        """Bloques que la última búsqueda encontró en el buffer."""
+        return self._last_hits
+
+    def reset_block_reads(self) -> None:
+        self._pool.reset_stats()
+        self._last_reads = self._last_hits = 0
+
+    def set_buffer_blocks(self, blocks: int) -> None:
+        self._pool.resize(blocks)
+        self.buffer_blocks = blocks
+
+    def peek_block(self, block_index: int) -> Sequence[int]:
+        """Claves del bloque sin pasar por el buffer ni contar lecturas (para mostrarlo)."""
+        start = block_index * self.block_size
+        if not 0 <= start < len(self.items):
+            return []
+        return self.items[start : start + self.block_size]
+
+    def read_block(self, block_index: int) -> Sequence[int]:
+        """Claves del bloque (sin relleno) a través del buffer.
+
+        Si el bloque no está en el buffer cuenta una lectura; con almacenamiento
+        'disco' solo se leen del archivo los bytes del bloque.
+        """
+        start = block_index * self.block_size
+        if not 0 <= start < len(self.items):
+            return []
+        return self._pool.get(block_index, self.peek_block)
+
+    def _written(self, index: int) -> None:
+        """Marca sucios los bloques del buffer alterados por una escritura en ``index``."""
+        self._pool.update(index // self.block_size, self.peek_block)
+
+    def get_block(self, block_index: int, fill: bool = True) -> List[Optional[int]]:
         size = self.block_size
-        for b in range(self.block_count):
-            start = b * size
-            end = min(start + size, len(self.items))
-            if start >= len(self.items):
-                block: List[Optional[int]] = []
-            else:
-                block = list(self.items[start:end])
-            if fill and len(block) < size:
-                block.extend([None] * (size - len(block)))
-            blocks.append(block)
-        return blocks
+        block: List[Optional[int]] = list(self.read_block(block_index))
+        if fill and len(block) < size:
+            block.extend([None] * (size - len(block)))
+        return block
+
+    def get_blocks(self, fill: bool = True) -> List[List[Optional[int]]]:
+        return [self.get_block(b, fill) for b in range(self.block_count)]
 
     def get_block_base(self, block_index: int) -> Optional[int]:
-        size = self.block_size
-        start = block_index * size
-        end = min(start + size, len(self.items))
-        if start >= len(self.items) or end == 0:
-            return None
-        return self.items[end - 1]
+        block = self.read_block(block_index)
+        return block[-1] if block else None
+
+    @property
+    def used_blocks(self) -> int:
+        return -(-len(self.items) // self.block_size)
 
     def get_block_bases(self) -> List[Optional[int]]:
         return [self.get_block_base(i) for i in range(self.block_count)]
@@ -114,150 +199,214 @@ class ExternalStructureBase:
     def is_full(self) -> bool:
         return len(self.items) >= self.capacity
 
+    # Snapshots con copia al escribir
+    def snapshot(self) -> Snapshot:
+        """Estado actual en O(1); la próxima escritura copia el almacenamiento."""
+        return take_snapshot(self, self._SNAPSHOT_FIELDS)
+
+    def restore(self, snapshot: Snapshot) -> None:
+        """Vuelve al estado de ``snapshot`` en O(1)."""
+        restore_snapshot(self, snapshot)
+        self._pool.clear()
+
+    def _before_write(self) -> None:
+        if self._shared:
+            self.items = copy_storage(self.items)
+            self._shared = False
+
     def insert(self, value: int) -> int:
         if self.is_full:
             raise ValueError("La estructura está llena")
         if not self._valid_key(value):
             raise ValueError("La clave no cumple la longitud configurada")
-        idx = bisect.bisect_left(self.items, value)
+        idx = bisect_keys(self.items, value)
         if idx < len(self.items) and self.items[idx] == value:
             raise ValueError("La clave ya existe (duplicada)")
+        self.read_block(idx // self.block_size)
+        self._before_write()
         self.items.insert(idx, value)
+        self._written(idx)
         return idx
 
     def delete(self, value: int) -> int:
-        idx = bisect.bisect_left(self.items, value)
+        idx = bisect_keys(self.items, value)
         if idx == len(self.items) or self.items[idx] != value:
             raise ValueError("La clave no existe")
+        self.read_block(idx // self.block_size)
+        self._before_write()
         self.items.pop(idx)
+        self._written(idx)
         return idx
 
+    def insert_many(self, keys: Iterable[int]) -> int:
+        """Inserta un lote con una sola mezcla; si alguna clave falla no se inserta ninguna."""
+        batch = sorted_batch(keys, self.key_length)
+        if len(self.items) + len(batch) > self.capacity:
+            raise ValueError("El lote excede la capacidad disponible")
+        items = self.items
+        positions = [bisect_keys(items, v) for v in batch]
+        for v, i in zip(batch, positions):
+            if i < len(items) and items[i] == v:
+                raise ValueError(f"La clave {v} ya existe (duplicada)")
+        self.items = make_storage(splice_sorted(items, batch, positions), self.storage)
+        self._shared = False
+        if positions:
+            self._written(positions[0])
+        return len(batch)
+
+    def delete_many(self, keys: Iterable[int]) -> int:
+        """Elimina un lote con una sola pasada; si alguna clave no existe no se elimina ninguna."""
+        batch = sorted_batch(keys, self.key_length)
+        items = self.items
+        positions = [bisect_keys(items, v) for v in batch]
+        for v, i in zip(batch, positions):
+            if i == len(items) or items[i] != v:
+                raise ValueError(f"La clave {v} no existe")
+        self.items = make_storage(drop_positions(items, positions), self.storage)
+        self._shared = False
+        if positions:
+            self._written(positions[0])
+        return len(batch)
+
+    # Archivo de bloques
+    @classmethod
+    def open_block_file(
+        cls, path: str, capacity: int, key_length: int, large: bool = False, buffer_blocks: int = 0
+    ) -> "ExternalStructureBase":
+        """Abre un archivo de claves int32 ordenadas y trabaja sobre él en disco.
+
+        Se valida recorriéndolo de a tramos, sin cargarlo entero en memoria; los
+        cambios se escriben en el mismo archivo (``close`` al terminar), salvo
+        después de un snapshot, cuando la copia al escribir pasa a un temporal.
+        """
+        structure = cls(capacity, key_length, storage="disco", large=large, buffer_blocks=buffer_blocks)
+        keys = BlockFile(path=path)
+        try:
+            _check_block_file(keys, key_length, capacity)
+        except ValueError:
+            keys.close()
+            raise
+        structure.items = keys
+        return structure
+
+    def close(self) -> None:
+        """Cierra el archivo de bloques (almacenamiento 'disco')."""
+        if isinstance(self.items, BlockFile):
+            self.items.close()
+
     # Serialización
     def to_dict(self) -> Dict[str, Any]:
+        datos = list(self.items)
         return {
             "tipo": self.type_name,
             "capacidad": self.capacity,
             "longitud_clave": int(self.key_length),
-            "datos": list(self.items),
+            "datos": datos,
+            "suma_control": keys_checksum((self.type_name, self.capacity, int(self.key_length)), datos),
+            **({"modo_grande": True} if self.large else {}),
         }
 
     def to_json(self) -> str:
-        return json.dumps(self.to_dict(), ensure_ascii=False, indent=2)
+        return json.dumps(self.to_dict(), ensure_ascii=False, indent=json_indent(self.large))
 
     @classmethod
-    def from_dict(cls, data: Dict[str, Any]) -> "ExternalStructureBase":
+    def from_dict(cls, data: Dict[str, Any], trusted: bool = False) -> "ExternalStructureBase":
+        """Con ``trusted``, un archivo cuya 'suma_control' coincide se carga sin validar las claves."""
         if not isinstance(data, dict) or data.get("tipo") != cls.type_name:
             raise ValueError(f"Archivo incompatible: 'tipo' debe ser '{cls.type_name}'")
         capacidad = data.get("capacidad")
         klen = data.get("longitud_clave")
         datos = data.get("datos")
+        large = bool(data.get("modo_grande", False))
         if not isinstance(capacidad, int) or capacidad <= 0:
             raise ValueError("Capacidad inválida en archivo")
-        if capacidad > 10000 or not _is_multiple_of_10(capacidad):
-            raise ValueError("Capacidad debe ser múltiplo de 10 y ≤ 10000")
+        limit = capacity_limit(large)
+        if capacidad > limit or not is_multiple_of_10(capacidad):
+            raise ValueError(f"Capacidad debe ser múltiplo de 10 y ≤ {limit}")
         if not isinstance(klen, int) or not (1 <= klen <= 9):
             raise ValueError("Longitud de clave inválida en archivo")
-        if not isinstance(datos, list):
+        if not isinstance(datos, (list, array)):  # array: formato binario
             raise ValueError("Estructura de datos inválida en archivo")
-        for value in datos:
-            if not isinstance(value, int):
-                raise ValueError("Los datos deben ser enteros")
-            if len(str(abs(value))) != klen:
-                raise ValueError("Clave con longitud no compatible")
-        return cls(capacidad, klen, list(datos))
-
-    def generate_random(self, count: int) -> int:
+        if trusted and checksum_matches(data, (cls.type_name, capacidad, klen)):
+            structure = cls(capacidad, klen, large=large)
+            structure.items = make_storage(datos, structure.storage)
+            return structure
+        # __post_init__ valida y ordena en una sola pasada
+        return cls(capacidad, klen, datos, large=large)
+
+    def generate_random(self, count: int, seed: Optional[int] = None) -> int:
         if count <= 0:
             return 0
         remaining_capacity = self.capacity - len(self.items)
         if remaining_capacity <= 0:
             return 0
         to_add = min(count, remaining_capacity)
-        k = int(self.key_length)
-        min_val = 0 if k == 1 else 10 ** (k - 1)
-        max_val = 10 ** k - 1
-        available_unique = max_val - min_val + 1
-        existing = set(self.items)
-        remaining_unique = available_unique - len(existing)
-        if remaining_unique <= 0:
-            return 0
-        to_add = min(to_add, remaining_unique)
-        added_vals: List[int] = []
-        while len(added_vals) < to_add:
-            v = random.randint(min_val, max_val)
-            if v in existing:
-                continue
-            existing.add(v)
-            added_vals.append(v)
-        self.items.extend(added_vals)
-        self.items.sort()
+        # sample_new_keys ya limita a las claves únicas disponibles
+        added_vals = sample_new_keys(self.key_length, self.items, to_add, random.Random(seed))
+        self.items = make_storage(merge_sorted(self.items, added_vals), self.storage)
+        self._shared = False
+        self._written(0)
         return len(added_vals)
 
-    # Métodos de búsqueda (a implementar en subclases)
-    def find(self, value: int) -> SearchResult:  # pragma: no cover - abstract
+    # Métodos de búsqueda (las subclases implementan _find)
+    def find(self, value: int) -> SearchResult:
+        reads, hits = self._pool.misses, self._pool.hits
+        result = self._find(value) if self._valid_key(value) else SearchResult.not_found()
+        self._last_reads = self._pool.misses - reads
+        self._last_hits = self._pool.hits - hits
+        return result
+
+    def _find(self, value: int) -> SearchResult:  # pragma: no cover - abstract
         raise NotImplementedError
 
 
 class ExternalSequentialStructure(ExternalStructureBase):
     type_name = "externa_secuencial"
 
-    def _find_block_sequential(self, value: int) -> Optional[int]:
-        bases = self.get_block_bases()
-        last_valid_block = -1
-        for i, base in enumerate(bases):
-            if base is None:
+    def _find(self, value: int) -> SearchResult:
+        # Se leen los bloques en orden hasta el primero cuya base alcanza el
+        # valor; la búsqueda dentro del bloque reutiliza esa misma lectura.
+        block: Sequence[int] = ()
+        b = -1
+        for i in range(self.used_blocks):
+            block, b = self.read_block(i), i
+            if value <= block[-1]:
                 break
-            last_valid_block = i
-            if value <= base:
-                return i
-        if last_valid_block != -1:
-            return last_valid_block
-        return None
-
-    def find(self, value: int) -> SearchResult:
-        if not self._valid_key(value):
+        if b == -1:
             return SearchResult.not_found()
-        block = self._find_block_sequential(value)
-        if block is None:
-            return SearchResult.not_found()
-        size = self.block_size
-        start = block * size
-        end = min(start + size, len(self.items))
-        for offset, idx in enumerate(range(start, end)):
-            if self.items[idx] == value:
-                return SearchResult(idx, block, offset, True)
-        return SearchResult.not_found(block)
+        for offset, key in enumerate(block):
+            if key == value:
+                return SearchResult(b * self.block_size + offset, b, offset, True)
+        return SearchResult.not_found(b)
 
 
 class ExternalBinaryStructure(ExternalStructureBase):
     type_name = "externa_binaria"
 
-    def _find_block_binary(self, value: int) -> Optional[int]:
-        bases = []
-        indices = []
-        for i, base in enumerate(self.get_block_bases()):
-            if base is None:
-                break
-            bases.append(base)
-            indices.append(i)
-        if not bases:
-            return None
-        pos = bisect.bisect_left(bases, value)
-        if pos >= len(indices):
-            return None
-        return indices[pos]
-
-    def find(self, value: int) -> SearchResult:
-        if not self._valid_key(value):
-            return SearchResult.not_found()
-        block = self._find_block_binary(value)
-        if block is None:
+    def _find_block_binary(self, value: int) -> Tuple[Optional[int], Sequence[int]]:
+        """Primer bloque cuya base es ≥ value, con su contenido.
+
+        Solo lee los bloques que consulta la bisección; el bloque resultado es
+        el último que la acotó por arriba, así que no se vuelve a leer.
+        """
+        lo, hi = 0, self.used_blocks
+        found: Sequence[int] = ()
+        while lo < hi:
+            mid = (lo + hi) // 2
+            block = self.read_block(mid)
+            if block[-1] < value:
+                lo = mid + 1
+            else:
+                hi, found = mid, block
+        if lo == self.used_blocks:
+            return None, ()
+        return lo, found
+
+    def _find(self, value: int) -> SearchResult:
+        b, block = self._find_block_binary(value)
+        if b is None:
             return SearchResult.not_found()
-        size = self.block_size
-        start = block * size
-        end = min(start + size, len(self.items))
-        block_slice = self.items[start:end]
-        pos = bisect.bisect_left(block_slice, value)
-        if pos < len(block_slice) and block_slice[pos] == value:
-            return SearchResult(start + pos, block, pos, True)
-        return SearchResult.not_found(block)
+        pos = bisect.bisect_left(block, value)
+        if pos < len(block) and block[pos] == value:
+            return SearchResult(b * self.block_size + pos, b, pos, True)
+        return SearchResult.not_found(b)
@@ -1,26 +1,320 @@
 from __future__ import annotations
 
+from array import array
+from collections import Counter
 from dataclasses import dataclass, field
-from typing import List, Optional, Any, Dict, Tuple
+import copy
+from typing import List, Optional, Any, Dict, Iterable, Tuple
 import json
+import math
 import random
 
+try:  # NumPy es opcional: acelera el cálculo de direcciones por lotes
+    import numpy as np
+except ImportError:  # pragma: no cover - depende del entorno
+    np = None
 
-def _is_power_of_10(n: int) -> bool:
-    if n <= 0:
-        return False
-    while n % 10 == 0:
-        n //= 10
-    return n == 1
+from .common import (
+    Snapshot,
+    capacity_limit,
+    checksum_matches,
+    is_power_of_10,
+    json_indent,
+    key_range,
+    keys_checksum,
+    merge_sorted,
+    restore_snapshot,
+    sample_new_keys,
+    shuffle_keys,
+    take_snapshot,
+)
+from .hash_strategies import (
+    COLLISION_STRATEGIES,
+    HASH_FUNCTIONS,
+    TOMBSTONE,
+    CollisionStrategy,
+    HashFunction,
+    Node,
+    TableFullError,
+)
 
 
-TOMBSTONE = object()
+# Por debajo de este tamaño de lote convertir a NumPy cuesta más de lo que ahorra
+_VECTOR_MIN = 64
 
+# Claves por lote en las cargas masivas (las direcciones se recalculan si la tabla crece)
+_BATCH = 4096
 
-@dataclass
-class Node:
-    value: int
-    next: Optional["Node"] = None
+# Palabras int32 fuera del rango de claves para la suma de control de la tabla
+_EMPTY_WORD = -(2 ** 31)  # posición vacía / fin de bucket
+_DELETED_WORD = 2 ** 31 - 1  # marca de borrado
+
+
+def _table_words(datos: List[Any], chained: bool) -> List[int]:
+    """'datos' de la tabla aplanado a enteros para ``keys_checksum``."""
+    if chained:
+        words: List[int] = []
+        for bucket in datos:
+            words.extend(bucket if isinstance(bucket, list) else ())
+            words.append(_EMPTY_WORD)
+        return words
+    return [_EMPTY_WORD if x is None else x if x.__class__ is int else _DELETED_WORD for x in datos]
+
+
+class HashStats:
+    """Métricas de sondeo y distribución, actualizadas en cada operación.
+
+    - Búsqueda exitosa: sondeos necesarios para llegar a cada clave guardada
+      (posición en la secuencia de sondeo o en la cadena).
+    - Búsqueda fallida: sondeos observados en las consultas sin resultado.
+    - Clusters: corridas de posiciones ocupadas (claves o marcas de borrado)
+      en orden de índice; una corrida que da la vuelta cuenta como dos.
+    - Sesgo: cuántas claves tienen cada posición como dirección base.
+    """
+
+    def __init__(self, capacity: int, chained: bool):
+        self.capacity = capacity
+        self.chained = chained
+        self.keys = 0
+        self.hit_total = 0
+        self.hit_hist: Counter[int] = Counter()
+        self.miss_count = 0
+        self.miss_total = 0
+        self.miss_max = 0
+        self.home_counts = array("i", [0]) * capacity
+        self.home_sumsq = 0
+        self.home_hist: Counter[int] = Counter()
+        self.chain_lengths = array("i", [0]) * capacity if chained else array("i")
+        self.chain_hist: Counter[int] = Counter()
+        self.cluster_hist: Counter[int] = Counter()
+        self._run_end: Dict[int, int] = {}  # inicio -> fin
+        self._run_start: Dict[int, int] = {}  # fin -> inicio
+
+    def copy(self) -> "HashStats":
+        other = copy.copy(self)
+        other.hit_hist = Counter(self.hit_hist)
+        other.home_counts = self.home_counts[:]
+        other.home_hist = Counter(self.home_hist)
+        other.chain_lengths = self.chain_lengths[:]
+        other.chain_hist = Counter(self.chain_hist)
+        other.cluster_hist = Counter(self.cluster_hist)
+        other._run_end = dict(self._run_end)
+        other._run_start = dict(self._run_start)
+        return other
+
+    @staticmethod
+    def _move(hist: Counter[int], old: int, new: int) -> None:
+        if old:
+            hist[old] -= 1
+            if not hist[old]:
+                del hist[old]
+        if new:
+            hist[new] += 1
+
+    def key_added(self, home: int, probes: int) -> None:
+        self.keys += 1
+        c = self.home_counts[home]
+        self.home_counts[home] = c + 1
+        self.home_sumsq += 2 * c + 1
+        self._move(self.home_hist, c, c + 1)
+        if self.chained:
+            # La clave queda al final de su cadena: probes == largo nuevo
+            self._move(self.chain_hist, probes - 1, probes)
+            self.chain_lengths[home] = probes
+        self.hit_total += probes
+        self.hit_hist[probes] += 1
+
+    def key_removed(self, home: int, probes: int) -> None:
+        self.keys -= 1
+        c = self.home_counts[home]
+        self.home_counts[home] = c - 1
+        self.home_sumsq -= 2 * c - 1
+        self._move(self.home_hist, c, c - 1)
+        if self.chained:
+            # Las claves detrás de la eliminada avanzan una posición: la suma de
+            # posiciones de la cadena baja en su largo anterior.
+            length = self.chain_lengths[home]
+            self.chain_lengths[home] = length - 1
+            self._move(self.chain_hist, length, length - 1)
+            self.hit_total -= length
+            self._move(self.hit_hist, length, 0)
+        else:
+            self.hit_total -= probes
+            self._move(self.hit_hist, probes, 0)
+
+    def key_moved(self, old_probes: int, new_probes: int) -> None:
+        """Una clave cambió de posición dentro de su secuencia de sondeo."""
+        self.hit_total += new_probes - old_probes
+        self._move(self.hit_hist, old_probes, new_probes)
+
+    @staticmethod
+    def _move_many(hist: Counter[int], old, new) -> None:
+        # Primero se suma: los valores que salen siempre llegaron antes
+        for values, sign in ((new, 1), (old, -1)):
+            for v, c in zip(*np.unique(values[values > 0], return_counts=True)):
+                hist[int(v)] += sign * int(c)
+        for v in [v for v, c in hist.items() if not c]:
+            del hist[v]
+
+    def keys_added(self, homes: List[int], probes: List[int]) -> None:
+        """key_added para un lote: los histogramas se ajustan una vez por valor."""
+        if np is None or len(homes) < _VECTOR_MIN:
+            for h, p in zip(homes, probes):
+                self.key_added(h, p)
+            return
+        self.keys += len(homes)
+        positions, added = np.unique(np.array(homes, dtype=np.int64), return_counts=True)
+        counts = np.frombuffer(self.home_counts, dtype=np.int32)
+        before = counts[positions].astype(np.int64)
+        after = before + added
+        counts[positions] = after
+        self.home_sumsq += int((after * after - before * before).sum())
+        self._move_many(self.home_hist, before, after)
+        if self.chained:
+            # Cada clave queda al final de su cadena: el largo crece en las agregadas
+            lengths = np.frombuffer(self.chain_lengths, dtype=np.int32)
+            before = lengths[positions].astype(np.int64)
+            after = before + added
+            lengths[positions] = after
+            self._move_many(self.chain_hist, before, after)
+        probes_np = np.array(probes, dtype=np.int64)
+        self.hit_total += int(probes_np.sum())
+        self._move_many(self.hit_hist, np.zeros(0, dtype=np.int64), probes_np)
+
+    def keys_moved(self, old_probes: List[int], new_probes: List[int]) -> None:
+        """key_moved para un lote."""
+        if np is None or len(old_probes) < _VECTOR_MIN:
+            for a, b in zip(old_probes, new_probes):
+                self.key_moved(a, b)
+            return
+        old, new = np.array(old_probes, dtype=np.int64), np.array(new_probes, dtype=np.int64)
+        self.hit_total += int((new - old).sum())
+        self._move_many(self.hit_hist, old, new)
+
+    def search_missed(self, probes: int) -> None:
+        self.miss_count += 1
+        self.miss_total += probes
+        self.miss_max = max(self.miss_max, probes)
+
+    def slot_filled(self, index: int) -> None:
+        start = self._run_start.pop(index - 1, index) if index > 0 else index
+        end = self._run_end.pop(index + 1, index)
+        if start != index:
+            self._move(self.cluster_hist, index - start, 0)
+            del self._run_end[start]
+        if end != index:
+            self._move(self.cluster_hist, end - index, 0)
+            del self._run_start[end]
+        self._run_end[start] = end
+        self._run_start[end] = start
+        self.cluster_hist[end - start + 1] += 1
+
+    def slot_cleared(self, index: int, occupied) -> None:
+        start = index
+        while start > 0 and occupied(start - 1):
+            start -= 1
+        end = self._run_end.pop(start)
+        del self._run_start[end]
+        self._move(self.cluster_hist, end - start + 1, 0)
+        for a, b in ((start, index - 1), (index + 1, end)):
+            if a <= b:
+                self._run_end[a] = b
+                self._run_start[b] = a
+                self.cluster_hist[b - a + 1] += 1
+
+    def slots_filled(self, indices: List[int]) -> None:
+        """slot_filled para un lote de posiciones distintas que estaban libres:
+        las corridas se vuelven a unir de una vez."""
+        if np is None or len(indices) < _VECTOR_MIN or len(indices) * 8 < len(self._run_end):
+            for i in indices:
+                self.slot_filled(i)
+            return
+        n = len(self._run_end)
+        new = np.array(indices, dtype=np.int64)
+        starts = np.concatenate((np.fromiter(self._run_end.keys(), np.int64, n), new))
+        ends = np.concatenate((np.fromiter(self._run_end.values(), np.int64, n), new))
+        order = np.argsort(starts)
+        starts, ends = starts[order], ends[order]
+        # Corridas disjuntas y ordenadas: se unen las que quedan pegadas
+        first = np.ones(len(starts), dtype=bool)
+        first[1:] = starts[1:] != ends[:-1] + 1
+        last = np.ones(len(starts), dtype=bool)
+        last[:-1] = first[1:]
+        starts, ends = starts[first], ends[last]
+        lengths, counts = np.unique(ends - starts + 1, return_counts=True)
+        starts, ends = starts.tolist(), ends.tolist()
+        self._run_end = dict(zip(starts, ends))
+        self._run_start = dict(zip(ends, starts))
+        self.cluster_hist = Counter(dict(zip(lengths.tolist(), counts.tolist())))
+
+    def report(self) -> Dict[str, Any]:
+        n = self.keys
+        mean = n / self.capacity
+        variance = self.home_sumsq / self.capacity - mean * mean
+        report: Dict[str, Any] = {
+            "claves": n,
+            "exitosa": {
+                "promedio": self.hit_total / n if n else 0.0,
+                "maximo": max(self.hit_hist, default=0),
+            },
+            "fallida": {
+                "busquedas": self.miss_count,
+                "promedio": self.miss_total / self.miss_count if self.miss_count else 0.0,
+                "maximo": self.miss_max,
+            },
+            "sesgo": {
+                "max_por_posicion": max(self.home_hist, default=0),
+                "posiciones_usadas": sum(self.home_hist.values()),
+                "coef_variacion": math.sqrt(max(variance, 0.0)) / mean if n else 0.0,
+            },
+        }
+        if self.chained:
+            report["cadenas"] = dict(sorted(self.chain_hist.items()))
+        else:
+            report["clusters"] = dict(sorted(self.cluster_hist.items()))
+        return report
+
+
+class _StatsBatch:
+    """Junta las altas de claves y posiciones de una carga masiva para
+    aplicarlas a ``stats`` de una vez."""
+
+    def __init__(self, stats: HashStats):
+        self.stats = stats
+        self.filled: List[int] = []
+        self.homes: List[int] = []
+        self.probes: List[int] = []
+        self.moved_from: List[int] = []
+        self.moved_to: List[int] = []
+
+    def key_added(self, home: int, probes: int) -> None:
+        self.homes.append(home)
+        self.probes.append(probes)
+
+    def key_moved(self, old_probes: int, new_probes: int) -> None:
+        self.moved_from.append(old_probes)
+        self.moved_to.append(new_probes)
+
+    def slot_filled(self, index: int) -> None:
+        self.filled.append(index)
+
+    def slots_filled(self, indices: List[int]) -> None:
+        self.filled.extend(indices)
+
+    def keys_added(self, homes: List[int], probes: List[int]) -> None:
+        self.homes.extend(homes)
+        self.probes.extend(probes)
+
+    def slot_cleared(self, index: int, occupied) -> None:
+        # Las inserciones no vacían posiciones; por las dudas se respeta el orden
+        self.stats.slots_filled(self.filled)
+        self.filled = []
+        self.stats.slot_cleared(index, occupied)
+
+    def apply(self) -> None:
+        self.stats.slots_filled(self.filled)
+        self.stats.keys_added(self.homes, self.probes)
+        self.stats.keys_moved(self.moved_from, self.moved_to)
 
 
 @dataclass
@@ -30,242 +324,461 @@ class HashStructure:
     hash_func: str  # 'cuadrado' | 'modular' | 'plegamiento' | 'truncamiento'
     collision: str  # 'secuencial' | 'doble' | 'cuadrado' | 'anidados' | 'encadenamiento'
     table: List[Any] = field(default_factory=list)
+    large: bool = False  # modo grande: capacidades hasta 10^7
+    # Fracción de marcas de borrado que dispara la compactación (None = nunca)
+    tombstone_threshold: Optional[float] = 0.25
+    # Redimensionado automático (x10 / ÷10, la capacidad sigue siendo potencia de 10)
+    auto_resize: bool = False
+    max_load: float = 0.75
+    min_load: float = 0.05
+    migrate_step: int = 64  # posiciones de la tabla vieja migradas por operación
+    # Contadores incrementales (se recalculan una sola vez al construir)
+    _size: int = field(default=0, init=False, repr=False, compare=False)
+    _tombstones: int = field(default=0, init=False, repr=False, compare=False)
+    # Tabla anterior mientras dura una migración incremental
+    _old: Optional["HashStructure"] = field(default=None, init=False, repr=False, compare=False)
+    _migrate_pos: int = field(default=0, init=False, repr=False, compare=False)
+    # Métricas de sondeo (None: se reconstruyen al usarlas, ver la propiedad _stats);
+    # _last_probes guarda el costo de la última consulta interna
+    _stats_data: Optional[HashStats] = field(default=None, init=False, repr=False, compare=False)
+    _last_probes: int = field(default=0, init=False, repr=False, compare=False)
+    # Estrategias resueltas una vez; la función hash se vuelve a ligar al cambiar la capacidad
+    _hasher: Optional[HashFunction] = field(default=None, init=False, repr=False, compare=False)
+    _collision: Optional[CollisionStrategy] = field(default=None, init=False, repr=False, compare=False)
+    # Estado auxiliar de la estrategia de colisión (p. ej. desplazamientos de Robin Hood)
+    _aux: Any = field(default=None, init=False, repr=False, compare=False)
+    # Tabla/_aux y métricas compartidas con un snapshot (se copian al escribir)
+    _shared: bool = field(default=False, init=False, repr=False, compare=False)
+    _stats_shared: bool = field(default=False, init=False, repr=False, compare=False)
+    # Rango de claves válidas (se comprueba en cada inserción: más barato que str())
+    _key_bounds: Tuple[int, int] = field(default=(0, 0), init=False, repr=False, compare=False)
+
+    _SNAPSHOT_FIELDS = (
+        "capacity",
+        "key_length",
+        "hash_func",
+        "collision",
+        "table",
+        "large",
+        "tombstone_threshold",
+        "auto_resize",
+        "max_load",
+        "min_load",
+        "migrate_step",
+        "_size",
+        "_tombstones",
+        "_stats",
+        "_hasher",
+        "_collision",
+        "_aux",
+    )
 
     def __post_init__(self):
         if not isinstance(self.capacity, int) or self.capacity <= 0:
             raise ValueError("Capacidad inválida")
-        if self.capacity > 10000 or not _is_power_of_10(self.capacity):
-            raise ValueError("La capacidad debe ser potencia de 10 y ≤ 10000")
+        limit = capacity_limit(self.large)
+        if self.capacity > limit or not is_power_of_10(self.capacity):
+            raise ValueError(f"La capacidad debe ser potencia de 10 y ≤ {limit}")
         if not (1 <= int(self.key_length) <= 9):
             raise ValueError("Longitud de clave inválida (1-9)")
+        self._key_bounds = key_range(self.key_length)
         self.hash_func = self.hash_func.lower()
         self.collision = self.collision.lower()
-        if self.hash_func not in {"cuadrado", "modular", "plegamiento", "truncamiento"}:
+        if self.hash_func not in HASH_FUNCTIONS:
             raise ValueError("Función hash no soportada")
-        if self.collision not in {"secuencial", "doble", "cuadrado", "anidados", "encadenamiento"}:
+        if self.collision not in COLLISION_STRATEGIES:
             raise ValueError("Estrategia de colisión no soportada")
+        self._collision = COLLISION_STRATEGIES[self.collision]
+        self._bind_hash()
         # Init table
         if not self.table:
-            if self.collision == "anidados":
-                self.table = [[] for _ in range(self.capacity)]
-            else:
-                self.table = [None] * self.capacity
-        else:
-            # Normalize table length
-            if len(self.table) != self.capacity:
-                raise ValueError("La tabla cargada no coincide con la capacidad")
+            # Tabla nueva: está vacía, no hace falta recorrerla para contar
+            self.table = self._new_table()
+            self._collision.attach(self)
+            self._stats = self._new_stats()
+            return
+        # Normalize table length
+        if len(self.table) != self.capacity:
+            raise ValueError("La tabla cargada no coincide con la capacidad")
+        self._collision.attach(self)
+        self._recount()
+        # Las métricas de una tabla cargada se arman recién cuando hacen falta
+        self._stats = None
+
+    def _bind_hash(self) -> None:
+        self._hasher = HASH_FUNCTIONS[self.hash_func](self.capacity)
+
+    @property
+    def chained(self) -> bool:
+        """True si cada posición guarda una lista/cadena de claves."""
+        return self._collision.chained
+
+    def _new_table(self) -> List[Any]:
+        return self._collision.new_table(self.capacity)
+
+    def _recount(self) -> None:
+        self._size, self._tombstones = self._collision.count(self.table)
+
+    def _new_stats(self) -> HashStats:
+        return HashStats(self.capacity, self.chained)
+
+    @property
+    def _stats(self) -> HashStats:
+        if self._stats_data is None:
+            self._rebuild_stats()
+        return self._stats_data  # type: ignore[return-value]
+
+    @_stats.setter
+    def _stats(self, stats: Optional[HashStats]) -> None:
+        self._stats_data = stats
+
+    def _rebuild_stats(self) -> None:
+        self._stats_data = self._new_stats()
+        self._collision.rebuild_stats(self)
+
+    def stats(self) -> Dict[str, Any]:
+        """Métricas de sondeo, clusters/cadenas y sesgo de la tabla actual."""
+        return {"hash_func": self.hash_func, "colision": self.collision, **self._stats.report()}
+
+    # Snapshots con copia al escribir
+    def snapshot(self) -> Snapshot:
+        """Estado actual en O(1) (completa antes una migración en curso)."""
+        self.finish_resize()
+        self._stats_shared = True
+        return take_snapshot(self, self._SNAPSHOT_FIELDS)
+
+    def restore(self, snapshot: Snapshot) -> None:
+        """Vuelve al estado de ``snapshot`` en O(1); descarta una migración en curso."""
+        restore_snapshot(self, snapshot)
+        self._stats_shared = True
+        self._old = None
+        self._migrate_pos = 0
+
+    def _before_write(self) -> None:
+        if self._shared:
+            self.table, self._aux = self._collision.clone(self)
+            self._shared = False
+        self._own_stats()
+
+    def _own_stats(self) -> None:
+        # Se arman antes de escribir: reconstruirlas a mitad de una operación
+        # contaría dos veces la clave que se está agregando o quitando
+        stats = self._stats
+        if self._stats_shared:
+            self._stats = stats.copy()
+            self._stats_shared = False
 
     @property
     def size(self) -> int:
-        if self.collision == "anidados":
-            return sum(len(x) for x in self.table if isinstance(x, list))
-        if self.collision == "encadenamiento":
-            total = 0
-            for head in self.table:
-                node = head
-                while isinstance(node, Node):
-                    total += 1
-                    node = node.next
-            return total
-        return sum(1 for x in self.table if isinstance(x, int))
+        if self._old is not None:
+            return self._size + self._old.size
+        return self._size
+
+    @property
+    def tombstones(self) -> int:
+        return self._tombstones
+
+    @property
+    def load_factor(self) -> float:
+        return self.size / self.capacity
+
+    # Redimensionado incremental
+    @property
+    def resizing(self) -> bool:
+        return self._old is not None
+
+    @property
+    def pending_migration(self) -> int:
+        """Posiciones de la tabla anterior que aún no se migraron."""
+        return self._old.capacity - self._migrate_pos if self._old is not None else 0
+
+    def _start_resize(self, new_capacity: int) -> None:
+        # La tabla actual pasa a un HashStructure aparte que se vacía de a poco;
+        # sin compactación propia, así sus marcas de borrado mantienen las secuencias.
+        old = copy.copy(self)
+        old.auto_resize = False
+        old.tombstone_threshold = None
+        self._reset_table(new_capacity)
+        self._old = old
+
+    def _reset_table(self, capacity: int) -> None:
+        self._old = None
+        self._migrate_pos = 0
+        self.capacity = capacity
+        self._bind_hash()
+        self.table = self._new_table()
+        self._collision.attach(self)
+        self._size = 0
+        self._tombstones = 0
+        self._stats = self._new_stats()
+
+    def _migrate_step(self, buckets: Optional[int] = None) -> None:
+        old = self._old
+        if old is None:
+            return
+        stop = min(self._migrate_pos + (buckets or self.migrate_step), old.capacity)
+        for i in range(self._migrate_pos, stop):
+            self._migrate_keys(old._take_bucket(i))
+            if self._old is None:  # se rehízo la tabla con todas las claves
+                return
+            self._migrate_pos = i + 1
+        if stop >= old.capacity:
+            self._old = None
+
+    def _migrate_keys(self, keys: List[int]) -> None:
+        """Pasa a la tabla actual claves ya quitadas de la anterior."""
+        for j, v in enumerate(keys):
+            try:
+                self._insert(v)
+            except TableFullError:
+                # La tabla nueva no alcanza (p. ej. un achique seguido de
+                # inserciones): las claves pendientes no se pierden
+                self._rehash(keys[j:])
+                return
+
+    def _rehash(self, pending: List[int]) -> None:
+        """Termina la migración en una tabla 10 veces más grande con todas las
+        claves: las de ambas tablas más ``pending`` (ya quitadas de la anterior)."""
+        new_capacity = self.capacity * 10
+        if new_capacity > capacity_limit(self.large):
+            # Sin margen para crecer: vuelven a la tabla anterior y se recorre de nuevo
+            for v in pending:
+                self._old._insert(v)
+            self._migrate_pos = 0
+            raise TableFullError("La estructura está llena")
+        keys = self.keys() + pending
+        self._reset_table(new_capacity)
+        for v in keys:
+            self._insert(v)
+
+    def finish_resize(self) -> None:
+        while self._old is not None:
+            self._migrate_step(self._old.capacity)
+
+    def _maybe_grow(self) -> None:
+        if not self.auto_resize or self.size + 1 <= self.max_load * self.capacity:
+            return
+        # Una migración en curso (p. ej. un achique) se termina antes de crecer
+        self.finish_resize()
+        new_capacity = self.capacity * 10
+        if self.size + 1 > self.max_load * self.capacity and new_capacity <= capacity_limit(self.large):
+            self._start_resize(new_capacity)
+
+    def _maybe_shrink(self) -> None:
+        if not self.auto_resize or self._old is not None or self.capacity <= 10:
+            return
+        # Solo se achica si la tabla resultante queda por debajo de max_load
+        if self.size < self.min_load * self.capacity and self.size * 10 < self.max_load * self.capacity:
+            self._start_resize(self.capacity // 10)
+
+    def _take_bucket(self, index: int) -> List[int]:
+        """Quita y devuelve las claves de una posición (usado al migrar)."""
+        return self._collision.take_bucket(self, index)
 
     def _valid_key(self, value: int) -> bool:
-        return isinstance(value, int) and len(str(abs(value))) == int(self.key_length)
-
-    def _h_square(self, value: int) -> int:
-        n = len(str(self.capacity - 1))  # digits of capacity - 1 equals exponent n
-        sq = value * value
-        s = str(sq)
-        if len(s) < n:
-            s = s.zfill(n)
-        start = (len(s) - n) // 2  # central block; if odd, picks middle-left as start
-        block = s[start:start + n]
-        return int(block) % self.capacity
-
-    def _h_modular(self, value: int) -> int:
-        return value % self.capacity
-
-    def _h_folding(self, value: int) -> int:
-        n = len(str(self.capacity - 1))
-        s = str(abs(value)).zfill(n)
-        total = 0
-        for i in range(0, len(s), n):
-            total += int(s[i:i + n])
-        return total % self.capacity
-
-    def _h_truncate(self, value: int) -> int:
-        n = len(str(self.capacity - 1))
-        s = str(abs(value)).zfill(n)
-        return int(s[-n:]) % self.capacity
+        lo, hi = self._key_bounds
+        return isinstance(value, int) and lo <= abs(value) <= hi
 
     def _hash(self, value: int) -> int:
-        if self.hash_func == "cuadrado":
-            return self._h_square(value)
-        if self.hash_func == "modular":
-            return self._h_modular(value)
-        if self.hash_func == "plegamiento":
-            return self._h_folding(value)
-        if self.hash_func == "truncamiento":
-            return self._h_truncate(value)
-        raise ValueError("Función hash no soportada")
-
-    def _index_at(self, h: int, value: int, i: int) -> int:
-        if i == 0:
-            return h
-        if self.collision == "secuencial":
-            return (h + i)
-        if self.collision == "doble":
-            # Avanza de 2 en 2: equivalente a ((hash + 1) mod tamaño) + 1
-            # usando índices 0-based en la tabla.
-            return (h + 2 * i) % self.capacity
-        if self.collision == "cuadrado":
-            return (h + i * i) % self.capacity
-        raise ValueError("Estrategia de colisión no soportada")
+        return self._hasher(value)
+
+    def hash_many(self, keys: Iterable[int]) -> List[int]:
+        """Direcciones base de un lote de claves (válidas) con la capacidad actual."""
+        keys = keys if isinstance(keys, list) else list(keys)
+        if np is not None and len(keys) >= _VECTOR_MIN:
+            return self._hasher.many(np.array(keys, dtype=np.int64)).tolist()
+        h = self._hasher
+        return [h(v) for v in keys]
+
+    def _hash_valid(self, keys: List[Any]) -> List[Optional[int]]:
+        """Como hash_many, pero deja None en las claves inválidas."""
+        valid = [v for v in keys if self._valid_key(v)]
+        if len(valid) == len(keys):
+            return self.hash_many(keys)
+        homes = iter(self.hash_many(valid))
+        return [next(homes) if self._valid_key(v) else None for v in keys]
 
     def find(self, value: int) -> int:
+        return self._lookup(value, None)
+
+    def find_many(self, keys: Iterable[int]) -> List[int]:
+        """find() para un lote: las direcciones base se calculan de una vez."""
+        keys = list(keys)
+        # Las búsquedas no cambian la capacidad, así que las direcciones siguen valiendo
+        return [self._lookup(v, h) for v, h in zip(keys, self._hash_valid(keys))]
+
+    def _lookup(self, value: int, home: Optional[int]) -> int:
+        self._migrate_step()
+        idx = self._find(value, home)
+        if idx == -1 and self._old is not None and self._old._find(value) != -1:
+            # Migración perezosa: la clave consultada pasa ya a la tabla nueva
+            self._old._delete(value)
+            self._migrate_keys([value])
+            idx = self._find(value)
+        if idx == -1:
+            self._own_stats()
+            self._stats.search_missed(self._last_probes)
+        return idx
+
+    def insert(self, value: int) -> Tuple[int, Optional[int], int]:
+        return self._add(value, None)
+
+    def insert_many(self, keys: Iterable[int], ignore_errors: bool = False) -> int:
+        """Inserta un lote de claves; devuelve cuántas se insertaron.
+
+        Con ``ignore_errors`` se saltean las claves inválidas, duplicadas o sin
+        lugar; si no, el primer error se propaga (las anteriores quedan insertadas).
+        """
+        keys = list(keys)
+        added = 0
+        for start in range(0, len(keys), _BATCH):
+            chunk = keys[start:start + _BATCH]
+            capacity = self.capacity
+            for v, h in zip(chunk, self._hash_valid(chunk)):
+                try:
+                    # Si la tabla creció a mitad del lote la dirección ya no sirve
+                    self._add(v, h if self.capacity == capacity else None)
+                    added += 1
+                except ValueError:
+                    if not ignore_errors:
+                        raise
+        return added
+
+    def _add(self, value: int, home: Optional[int]) -> Tuple[int, Optional[int], int]:
+        self._before_write()
+        self._migrate_step()
+        self._check_old_duplicate(value)
+        capacity = self.capacity
+        self._maybe_grow()
+        if self.capacity != capacity:
+            home = None
+            # La tabla que podía contener la clave acaba de pasar a _old
+            self._check_old_duplicate(value)
+        try:
+            return self._insert(value, home)
+        except TableFullError:
+            # El sondeo no alcanzó un hueco: se fuerza el crecimiento si está permitido
+            capacity = self.capacity
+            if not self.auto_resize or capacity * 10 > capacity_limit(self.large):
+                raise
+            self.finish_resize()
+            if self.capacity == capacity:  # terminar la migración puede ya haberla agrandado
+                self._start_resize(capacity * 10)
+            self._check_old_duplicate(value)
+            return self._insert(value)
+
+    def _fill(self, keys: List[int]) -> int:
+        """Coloca claves válidas y ausentes sin redimensionar (las que no entran
+        se saltean); devuelve cuántas entraron.
+
+        Las direcciones base salen de un solo cálculo por lotes y los
+        histogramas de las métricas se ajustan una vez al final del lote.
+        """
+        self._before_write()
+        stats = self._stats
+        batch = _StatsBatch(stats)
+        self._stats = batch
+        try:
+            return self._collision.fill(self, keys, self.hash_many(keys))
+        finally:
+            self._stats = stats
+            batch.apply()
+
+    def _check_old_duplicate(self, value: int) -> None:
+        if self._old is not None and self._old._find(value) != -1:
+            raise ValueError("La clave ya existe (duplicada)")
+
+    def delete(self, value: int) -> int:
+        self._before_write()
+        self._migrate_step()
+        if self._old is not None and self._old._find(value) != -1:
+            idx = self._old._delete(value)
+        else:
+            idx = self._delete(value)
+        self._maybe_shrink()
+        return idx
+
+    # Operaciones sobre la tabla actual (sin migración ni redimensionado)
+    def _find(self, value: int, home: Optional[int] = None) -> int:
+        self._last_probes = 0
         if not self._valid_key(value):
             return -1
-        h = self._hash(value)
-        # Nuevas estrategias: solo consulta (no inserta)
-        
-        if self.collision == "anidados":
-            bucket = self.table[h]
-            if isinstance(bucket, list) and value in bucket:
-                return h
-            return -1
-        if self.collision == "encadenamiento":
-            node = self.table[h]
-            while isinstance(node, Node):
-                if node.value == value:
-                    return h
-                node = node.next
-            return -1
-        for i in range(self.capacity):
-            idx = self._index_at(h, value, i)
-            slot = self.table[idx]
-            if slot is None:
-                return -1
-            if isinstance(slot, int) and slot == value:
-                return idx
-        return -1
+        return self._collision.find(self, value, self._hasher(value) if home is None else home)
 
-    def insert(self, value: int) -> Tuple[int, Optional[int], int]:
-        if self.collision not in {"anidados", "encadenamiento"} and self.size >= self.capacity:
-            raise ValueError("La estructura está llena")
+    def _insert(self, value: int, home: Optional[int] = None) -> Tuple[int, Optional[int], int]:
         if not self._valid_key(value):
             raise ValueError("La clave no cumple la longitud configurada")
-        if self.find(value) != -1:
-            raise ValueError("La clave ya existe (duplicada)")
-
-        h = self._hash(value)
-        # Nuevas estrategias: insertar en bucket
-        if self.collision == "anidados":
-            bucket = self.table[h]
-            if not isinstance(bucket, list):
-                bucket = []
-                self.table[h] = bucket
-            first_collision_index = h if len(bucket) > 0 else None
-            bucket.append(value)
-            return h, first_collision_index, 1
-
-        if self.collision == "encadenamiento":
-            head = self.table[h]
-            if isinstance(head, Node):
-                # Append at tail to preserve insertion order
-                node = head
-                while isinstance(node.next, Node):
-                    node = node.next
-                node.next = Node(value)
-                return h, h, 1
-            else:
-                self.table[h] = Node(value)
-                return h, None, 1
-
-        first_collision_index: Optional[int] = None
-        for i in range(self.capacity):
-            idx = self._index_at(h, value, i)
-            slot = self.table[idx]
-            if slot is None or slot is TOMBSTONE:
-                self.table[idx] = value
-                attempts = i + 1
-                return idx, first_collision_index, attempts
-            if first_collision_index is None:
-                first_collision_index = idx
-        raise ValueError("No se encontró espacio libre (tabla llena)")
+        return self._collision.insert(self, value, self._hasher(value) if home is None else home)
 
-    def delete(self, value: int) -> int:
-        idx = self.find(value)
+    def _delete(self, value: int) -> int:
+        idx = self._find(value)
         if idx == -1:
             raise ValueError("La clave no existe")
-        if self.collision == "anidados":
-            bucket = self.table[idx]
-            if isinstance(bucket, list):
-                try:
-                    bucket.remove(value)
-                except ValueError:
-                    pass
-            return idx
-        if self.collision == "encadenamiento":
-            prev: Optional[Node] = None
-            node = self.table[idx]
-            while isinstance(node, Node):
-                if node.value == value:
-                    if prev is None:
-                        self.table[idx] = node.next
-                    else:
-                        prev.next = node.next
-                    return idx
-                prev, node = node, node.next
-            return idx
-        self.table[idx] = TOMBSTONE
+        self._collision.remove(self, value, idx, self._last_probes)
+        if self.tombstone_threshold is not None and self._tombstones > self.tombstone_threshold * self.capacity:
+            self.compact()
         return idx
 
+    def compact(self) -> int:
+        """Reconstruye la tabla sin marcas de borrado; devuelve cuántas se eliminaron."""
+        self.finish_resize()
+        removed = self._tombstones
+        if removed == 0:
+            return 0
+        keys = self.keys()
+        # La tabla se arma aparte: si alguna clave no entra se vuelve a la anterior
+        saved = (self.table, self._aux, self._stats, self._size, self._tombstones)
+        self.table = self._new_table()
+        self._collision.attach(self)
+        self._size = 0
+        self._tombstones = 0
+        self._stats = self._new_stats()
+        try:
+            for v, h in zip(keys, self.hash_many(keys)):
+                self._insert(v, h)
+        except TableFullError:
+            self.table, self._aux, self._stats, self._size, self._tombstones = saved
+            return 0
+        self._shared = self._stats_shared = False
+        return removed
+
     # Random generation avoiding duplicates
-    def generate_random(self, count: int) -> int:
+    def generate_random(self, count: int, seed: Optional[int] = None) -> int:
         if count <= 0:
             return 0
-        remaining_capacity = self.capacity - self.size
+        max_size = capacity_limit(self.large) if self.auto_resize else self.capacity
+        remaining_capacity = max_size - self.size
         if remaining_capacity <= 0:
             return 0
         to_add = min(count, remaining_capacity)
-        k = int(self.key_length)
-        min_val = 0 if k == 1 else 10 ** (k - 1)
-        max_val = 10 ** k - 1
+        rng = random.Random(seed)
+        excluded = sorted(self.keys())
         added = 0
         while added < to_add:
-            v = random.randint(min_val, max_val)
-            if self.find(v) != -1:
-                continue
-            try:
-                self.insert(v)
-                added += 1
-            except Exception:
-                # If insertion fails due to clustering, try another number
-                pass
+            batch = sample_new_keys(self.key_length, excluded, to_add - added, rng)
+            if not batch:
+                break
+            # El lote sale ordenado: se mezcla con las excluidas sin reordenarlas
+            excluded = list(merge_sorted(excluded, batch))
+            shuffle_keys(batch, rng)
+            # Las claves que no entran por clustering se reemplazan en el próximo lote;
+            # si ninguna entró, la tabla ya no admite más (p. ej. cuckoo casi lleno)
+            if self._old is None and (
+                not self.auto_resize or self.size + len(batch) <= self.max_load * self.capacity
+            ):
+                placed = self._fill(batch)
+            else:
+                placed = self.insert_many(batch, ignore_errors=True)
+            if not placed:
+                break
+            added += placed
         return added
 
     # Serialization
     def to_dict(self) -> Dict[str, Any]:
-        datos: List[Any] = []
-        if self.collision in {"anidados", "encadenamiento"}:
-            for x in self.table:
-                if self.collision == "anidados":
-                    datos.append(list(x) if isinstance(x, list) else [])
-                else:
-                    arr: List[int] = []
-                    node = x
-                    while isinstance(node, Node):
-                        arr.append(node.value)
-                        node = node.next
-                    datos.append(arr)
-        else:
-            for x in self.table:
-                if x is None:
-                    datos.append(None)
-                elif x is TOMBSTONE:
-                    datos.append({"t": 1})
-                else:
-                    datos.append(x)
+        self.finish_resize()
+        datos = self._collision.dump(self.table)
+        header = ("hash", self.capacity, int(self.key_length), self.hash_func, self.collision)
         return {
             "tipo": "hash",
             "capacidad": self.capacity,
@@ -273,13 +786,18 @@ class HashStructure:
             "hash_func": self.hash_func,
             "colision": self.collision,
             "datos": datos,
+            "suma_control": keys_checksum(header, _table_words(datos, self.chained)),
+            **self._collision.dump_extra(self),
+            **({"modo_grande": True} if self.large else {}),
+            **({"auto_redimension": True} if self.auto_resize else {}),
         }
 
     def to_json(self) -> str:
-        return json.dumps(self.to_dict(), ensure_ascii=False, indent=2)
+        return json.dumps(self.to_dict(), ensure_ascii=False, indent=json_indent(self.large))
 
     @staticmethod
-    def from_dict(data: Dict[str, Any]) -> "HashStructure":
+    def from_dict(data: Dict[str, Any], trusted: bool = False) -> "HashStructure":
+        """Con ``trusted``, un archivo cuya 'suma_control' coincide se carga sin validar las claves."""
         if not isinstance(data, dict) or data.get("tipo") != "hash":
             raise ValueError("Archivo incompatible: 'tipo' debe ser 'hash'")
         capacidad = data.get("capacidad")
@@ -287,79 +805,46 @@ class HashStructure:
         hname = data.get("hash_func")
         cname = data.get("colision")
         datos = data.get("datos")
-        # Soporte de nuevas estrategias al cargar
-        if cname in {"anidados", "encadenamiento"}:
-            if not isinstance(datos, list) or len(datos) != capacidad:
-                raise ValueError("Estructura de datos invǭlida en archivo")
-            if cname == "anidados":
-                table_ai: List[List[int]] = []
-                for x in datos:
-                    if x is None:
-                        table_ai.append([])
-                    elif isinstance(x, list):
-                        bucket: List[int] = []
-                        for v in x:
-                            if not isinstance(v, int) or len(str(abs(v))) != klen:
-                                raise ValueError("Clave con longitud no compatible")
-                            bucket.append(v)
-                        table_ai.append(bucket)
-                    else:
-                        raise ValueError("Elemento de datos invǭlido en archivo")
-                return HashStructure(capacidad, klen, hname, cname, table_ai)
-            else:
-                table_ch: List[Optional[Node]] = []
-                for x in datos:
-                    if x is None:
-                        table_ch.append(None)
-                    elif isinstance(x, list):
-                        head: Optional[Node] = None
-                        for v in reversed(x):
-                            if not isinstance(v, int) or len(str(abs(v))) != klen:
-                                raise ValueError("Clave con longitud no compatible")
-                            head = Node(v, head)
-                        table_ch.append(head)
-                    else:
-                        raise ValueError("Elemento de datos invǭlido en archivo")
-                return HashStructure(capacidad, klen, hname, cname, table_ch)
+        large = bool(data.get("modo_grande", False))
+        auto_resize = bool(data.get("auto_redimension", False))
         if not isinstance(capacidad, int) or capacidad <= 0:
             raise ValueError("Capacidad inválida en archivo")
-        if capacidad > 10000 or not _is_power_of_10(capacidad):
-            raise ValueError("Capacidad debe ser potencia de 10 y ≤ 10000")
+        limit = capacity_limit(large)
+        if capacidad > limit or not is_power_of_10(capacidad):
+            raise ValueError(f"Capacidad debe ser potencia de 10 y ≤ {limit}")
         if not isinstance(klen, int) or not (1 <= klen <= 9):
             raise ValueError("Longitud de clave inválida en archivo")
-        if hname not in {"cuadrado", "modular", "plegamiento", "truncamiento"}:
+        if hname not in HASH_FUNCTIONS:
             raise ValueError("Función hash inválida en archivo")
-        if cname not in {"secuencial", "doble", "cuadrado", "anidados", "encadenamiento"}:
+        if cname not in COLLISION_STRATEGIES:
             raise ValueError("Colisión inválida en archivo")
-        if not isinstance(datos, list) or len(datos) != capacidad:
-            raise ValueError("Estructura de datos inválida en archivo")
-        table: List[Optional[int]] = [None] * capacidad
-        for i, x in enumerate(datos):
-            if x is None:
-                table[i] = None
-            elif isinstance(x, dict) and x.get("t") == 1:
-                table[i] = TOMBSTONE  # type: ignore[assignment]
-            elif isinstance(x, int):
-                if len(str(abs(x))) != klen:
-                    raise ValueError("Clave con longitud no compatible")
-                table[i] = x
-            else:
-                raise ValueError("Elemento de datos inválido en archivo")
-        return HashStructure(capacidad, klen, hname, cname, table)
+        strategy = COLLISION_STRATEGIES[cname]
+        trusted = (
+            trusted
+            and isinstance(datos, list)
+            and checksum_matches(
+                data, ("hash", capacidad, klen, hname, cname), _table_words(datos, strategy.chained)
+            )
+        )
+        table = strategy.load(datos, capacidad, klen, trusted)
+        structure = HashStructure(capacidad, klen, hname, cname, table, large=large, auto_resize=auto_resize)
+        strategy.load_extra(structure, data)
+        return structure
+
+    def keys(self) -> List[int]:
+        keys = self._collision.keys(self.table)
+        keys.extend(self.overflow)
+        if self._old is not None:
+            keys.extend(self._old.keys())
+        return keys
+
+    @property
+    def overflow(self) -> List[int]:
+        """Claves guardadas fuera de la tabla (reserva del cuckoo)."""
+        return self._collision.overflow(self)
 
-    # Utilidad para visualizacin/preview
+    # Utilidad para visualización/preview
     def bucket_items(self, index: int) -> List[int]:
         if not (0 <= index < self.capacity):
             return []
-        if self.collision == "anidados":
-            bucket = self.table[index]
-            return list(bucket) if isinstance(bucket, list) else []
-        if self.collision == "encadenamiento":
-            arr: List[int] = []
-            node = self.table[index]
-            while isinstance(node, Node):
-                arr.append(node.value)
-                node = node.next
-            return arr
-        x = self.table[index]
-        return [x] if isinstance(x, int) else []
+        return self._collision.bucket_items(self.table, index)
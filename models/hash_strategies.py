@@ -0,0 +1,1031 @@
+from __future__ import annotations
+
+import bisect
+from array import array
+import math
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Iterator, List, Optional, Tuple, Type
+
+try:  # NumPy es opcional: solo lo usan las versiones por lotes de las funciones hash
+    import numpy as np
+except ImportError:  # pragma: no cover - depende del entorno
+    np = None
+
+from .common import key_range
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .hash import HashStructure
+
+
+TOMBSTONE = object()
+
+
+class TableFullError(ValueError):
+    """No hay posición libre alcanzable para la clave."""
+
+
+class Node:
+    """Nodo de una cadena de encadenamiento (con __slots__: sin __dict__ por nodo)."""
+
+    __slots__ = ("value", "next")
+
+    def __init__(self, value: int, next: Optional["Node"] = None):
+        self.value = value
+        self.next = next
+
+    def __repr__(self) -> str:
+        return f"Node(value={self.value!r}, next={self.next!r})"
+
+    def __eq__(self, other: object) -> bool:
+        # Igualdad por contenido de la cadena, recorrida sin recursión
+        a, b = self, other
+        while isinstance(a, Node) and isinstance(b, Node):
+            if a.value != b.value:
+                return False
+            a, b = a.next, b.next
+        return a is None and b is None
+
+    __hash__ = None  # type: ignore[assignment]
+
+
+# Potencias de 10 hasta 10^19: alcanzan para el cuadrado de una clave de 9 dígitos.
+_POW10 = [10 ** i for i in range(20)]
+
+# Versión vectorizada: int64 alcanza hasta 10^18 (el cuadrado de 999999999 cabe).
+_POW10_NP = np.array(_POW10[:19], dtype=np.int64) if np is not None else None
+
+
+def _digits(value: int) -> int:
+    """Cantidad de dígitos decimales de un entero no negativo (0 tiene uno)."""
+    return max(1, bisect.bisect_right(_POW10, value))
+
+
+def _digits_np(values):
+    return np.maximum(np.searchsorted(_POW10_NP, values, side="right"), 1)
+
+
+# Funciones hash
+class HashFunction:
+    """Función hash ligada a una capacidad; ``many`` opera sobre un arreglo int64."""
+
+    name = ""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        # n = dígitos de capacidad - 1, es decir el exponente de la capacidad
+        self.n = _digits(capacity - 1)
+        self.pow_n = _POW10[self.n]
+
+    def __call__(self, value: int) -> int:
+        raise NotImplementedError
+
+    def many(self, values):
+        raise NotImplementedError
+
+
+HASH_FUNCTIONS: Dict[str, Type[HashFunction]] = {}
+
+
+def register_hash_function(cls: Type[HashFunction]) -> Type[HashFunction]:
+    HASH_FUNCTIONS[cls.name] = cls
+    return cls
+
+
+@register_hash_function
+class SquareHash(HashFunction):
+    name = "cuadrado"
+
+    def __call__(self, value: int) -> int:
+        n = self.n
+        sq = value * value
+        # Bloque central de n dígitos del cuadrado (rellenado a n con ceros a la
+        # izquierda); con cantidad impar sobrante se toma el del medio-izquierda.
+        length = max(_digits(sq), n)
+        drop = length - n - (length - n) // 2
+        return (sq // _POW10[drop]) % self.pow_n % self.capacity
+
+    def many(self, values):
+        n = self.n
+        sq = values * values
+        length = np.maximum(_digits_np(sq), n)
+        drop = length - n - (length - n) // 2
+        return sq // _POW10_NP[drop] % self.pow_n % self.capacity
+
+
+@register_hash_function
+class ModularHash(HashFunction):
+    name = "modular"
+
+    def __call__(self, value: int) -> int:
+        return value % self.capacity
+
+    def many(self, values):
+        return values % self.capacity
+
+
+@register_hash_function
+class FoldingHash(HashFunction):
+    name = "plegamiento"
+
+    def __call__(self, value: int) -> int:
+        # Suma de bloques de n dígitos tomados desde la izquierda; el último
+        # bloque puede quedar más corto.
+        v = abs(value)
+        n = self.n
+        rest = max(_digits(v), n) % n
+        total = 0
+        if rest:
+            v, total = divmod(v, _POW10[rest])
+        pow_n = self.pow_n
+        while v:
+            v, chunk = divmod(v, pow_n)
+            total += chunk
+        return total % self.capacity
+
+    def many(self, values):
+        values = np.abs(values)
+        # Primero el bloque corto de la derecha, luego bloques de n
+        p = _POW10_NP[np.maximum(_digits_np(values), self.n) % self.n]
+        total = values % p
+        values = values // p
+        while values.any():
+            total += values % self.pow_n
+            values //= self.pow_n
+        return total % self.capacity
+
+
+@register_hash_function
+class TruncationHash(HashFunction):
+    name = "truncamiento"
+
+    def __call__(self, value: int) -> int:
+        return abs(value) % self.pow_n % self.capacity
+
+    def many(self, values):
+        return np.abs(values) % self.pow_n % self.capacity
+
+
+# Estrategias de colisión
+class CollisionStrategy:
+    """Organización de la tabla y algoritmos de búsqueda/inserción/borrado.
+
+    Las instancias no guardan estado: operan sobre el HashStructure recibido
+    (tabla, contadores ``_size``/``_tombstones``, ``_stats`` y ``_last_probes``).
+    ``find`` deja en ``_last_probes`` los sondeos realizados.
+    """
+
+    name = ""
+    chained = False  # claves agrupadas por posición (listas o cadenas)
+
+    def new_table(self, capacity: int) -> List[Any]:
+        raise NotImplementedError
+
+    def attach(self, t: HashStructure) -> None:
+        """Prepara el estado auxiliar (``t._aux``) para la tabla actual de ``t``."""
+        t._aux = None
+
+    def clone(self, t: HashStructure) -> Tuple[List[Any], Any]:
+        """Copia independiente de (tabla, ``_aux``), usada al escribir sobre un snapshot."""
+        return list(t.table), t._aux
+
+    def count(self, table: List[Any]) -> Tuple[int, int]:
+        """(claves, marcas de borrado) de una tabla."""
+        raise NotImplementedError
+
+    def bucket_items(self, table: List[Any], index: int) -> List[int]:
+        raise NotImplementedError
+
+    def keys(self, table: List[Any]) -> List[int]:
+        """Claves de la tabla en orden de posición."""
+        return [v for i in range(len(table)) for v in self.bucket_items(table, i)]
+
+    def find(self, t: HashStructure, value: int, h: int) -> int:
+        raise NotImplementedError
+
+    def insert(self, t: HashStructure, value: int, h: int) -> Tuple[int, Optional[int], int]:
+        raise NotImplementedError
+
+    def remove(self, t: HashStructure, value: int, idx: int, probes: int) -> None:
+        """Quita una clave ya encontrada en ``idx`` con ``probes`` sondeos."""
+        raise NotImplementedError
+
+    def fill(self, t: HashStructure, keys: List[int], homes: List[int]) -> int:
+        """Inserta claves válidas y ausentes con sus direcciones base (las que
+        no tienen lugar se saltean); devuelve cuántas entraron."""
+        insert = self.insert
+        placed = 0
+        for v, h in zip(keys, homes):
+            try:
+                insert(t, v, h)
+            except TableFullError:
+                continue
+            placed += 1
+        return placed
+
+    def take_bucket(self, t: HashStructure, index: int) -> List[int]:
+        """Quita y devuelve las claves de una posición (usado al migrar)."""
+        raise NotImplementedError
+
+    def rebuild_stats(self, t: HashStructure) -> None:
+        raise NotImplementedError
+
+    def overflow(self, t: HashStructure) -> List[int]:
+        """Claves guardadas fuera de la tabla."""
+        return []
+
+    def dump(self, table: List[Any]) -> List[Any]:
+        """Contenido de la tabla para el campo 'datos' del JSON."""
+        raise NotImplementedError
+
+    def dump_extra(self, t: HashStructure) -> Dict[str, Any]:
+        """Campos adicionales del JSON propios de la estrategia."""
+        return {}
+
+    def load(self, datos: Any, capacity: int, key_length: int, trusted: bool = False) -> List[Any]:
+        """Tabla a partir del campo 'datos', validando cada elemento.
+
+        Con ``trusted`` (suma de control verificada) no se revisan las claves.
+        """
+        raise NotImplementedError
+
+    def load_extra(self, t: HashStructure, data: Dict[str, Any]) -> None:
+        """Restaura los campos de dump_extra sobre la estructura ya construida."""
+
+
+COLLISION_STRATEGIES: Dict[str, CollisionStrategy] = {}
+
+
+def register_collision(cls: Type[CollisionStrategy]) -> Type[CollisionStrategy]:
+    COLLISION_STRATEGIES[cls.name] = cls()
+    return cls
+
+
+def _check_key(value: Any, key_length: int) -> int:
+    lo, hi = key_range(key_length)
+    if not isinstance(value, int) or not lo <= abs(value) <= hi:
+        raise ValueError("Clave con longitud no compatible")
+    return value
+
+
+def _trust_key(value: Any, key_length: int) -> int:
+    return value
+
+
+def _check_datos(datos: Any, capacity: int) -> None:
+    if not isinstance(datos, list) or len(datos) != capacity:
+        raise ValueError("Estructura de datos inválida en archivo")
+
+
+def _load_slots(datos: Any, capacity: int, key_length: int, trusted: bool = False) -> List[Any]:
+    """Tabla de una clave por posición, sin marcas de borrado."""
+    _check_datos(datos, capacity)
+    if trusted:
+        return list(datos)
+    table: List[Any] = [None] * capacity
+    for i, x in enumerate(datos):
+        if isinstance(x, int):
+            table[i] = _check_key(x, key_length)
+        elif x is not None:
+            raise ValueError("Elemento de datos inválido en archivo")
+    return table
+
+
+class OpenAddressing(CollisionStrategy):
+    """Direccionamiento abierto: una clave por posición y marcas de borrado."""
+
+    def cycle(self, capacity: int) -> int:
+        """Largo del ciclo de la secuencia de sondeo; después de él solo se repiten posiciones."""
+        return capacity
+
+    def probe(self, h: int, capacity: int) -> Iterator[int]:
+        """Secuencia de sondeo circular desde h; termina tras un ciclo completo."""
+        raise NotImplementedError
+
+    def new_table(self, capacity: int) -> List[Any]:
+        return [None] * capacity
+
+    def count(self, table: List[Any]) -> Tuple[int, int]:
+        return len(self.keys(table)), table.count(TOMBSTONE)
+
+    def bucket_items(self, table: List[Any], index: int) -> List[int]:
+        x = table[index]
+        return [x] if isinstance(x, int) else []
+
+    def keys(self, table: List[Any]) -> List[int]:
+        # Comparar identidades es bastante más rápido que isinstance en tablas grandes
+        return [x for x in table if x is not None and x is not TOMBSTONE]
+
+    def find(self, t: HashStructure, value: int, h: int) -> int:
+        table = t.table
+        # Caso común: la clave está (o falta) en su dirección base
+        slot = table[h]
+        if slot is None or slot == value:
+            t._last_probes = 1
+            return -1 if slot is None else h
+        n = 0
+        for n, idx in enumerate(self.probe(h, t.capacity), 1):
+            slot = table[idx]
+            if slot is None:
+                break
+            if slot == value:
+                t._last_probes = n
+                return idx
+        t._last_probes = n
+        return -1
+
+    def insert(self, t: HashStructure, value: int, h: int) -> Tuple[int, Optional[int], int]:
+        if t._size >= t.capacity:
+            raise TableFullError("La estructura está llena")
+        table = t.table
+        # Un solo recorrido: detecta duplicados (hasta un hueco vacío) y
+        # recuerda la primera marca de borrado para reutilizarla.
+        first_collision_index: Optional[int] = None
+        target: Optional[Tuple[int, int]] = None  # (índice, intento)
+        if table[h] is None:
+            target = (h, 0)  # dirección base libre: no hay nada más que revisar
+        for i, idx in enumerate(self.probe(h, t.capacity) if target is None else ()):
+            slot = table[idx]
+            if slot is None:
+                if target is None:
+                    target = (idx, i)
+                break
+            if slot is TOMBSTONE:
+                if target is None:
+                    target = (idx, i)
+                continue
+            if slot == value:
+                raise ValueError("La clave ya existe (duplicada)")
+            if target is None and first_collision_index is None:
+                first_collision_index = idx
+        if target is None:
+            raise TableFullError("No se encontró espacio libre (tabla llena)")
+        idx, i = target
+        if table[idx] is TOMBSTONE:
+            t._tombstones -= 1
+        else:
+            t._stats.slot_filled(idx)
+        table[idx] = value
+        t._size += 1
+        t._stats.key_added(h, i + 1)
+        return idx, first_collision_index, i + 1
+
+    def fill(self, t: HashStructure, keys: List[int], homes: List[int]) -> int:
+        table, insert = t.table, self.insert
+        dist = t._aux if isinstance(t._aux, array) else None  # Robin Hood
+        direct: List[int] = []
+        placed = 0
+        for v, h in zip(keys, homes):
+            if table[h] is None:
+                # Caso común con carga baja: la dirección base está libre y la
+                # clave queda ahí igual que con insert, sin sondear
+                table[h] = v
+                t._size += 1
+                if dist is not None:
+                    dist[h] = 0
+                direct.append(h)
+                continue
+            try:
+                insert(t, v, h)
+            except TableFullError:
+                continue
+            placed += 1
+        t._stats.slots_filled(direct)
+        t._stats.keys_added(direct, [1] * len(direct))
+        return placed + len(direct)
+
+    def remove(self, t: HashStructure, value: int, idx: int, probes: int) -> None:
+        t.table[idx] = TOMBSTONE
+        t._size -= 1
+        t._tombstones += 1
+        t._stats.key_removed(t._hash(value), probes)
+
+    def take_bucket(self, t: HashStructure, index: int) -> List[int]:
+        x = t.table[index]
+        if not isinstance(x, int):
+            return []
+        h = t._hash(x)
+        self.find(t, x, h)
+        # Marca de borrado: las claves restantes siguen alcanzables por sondeo
+        t.table[index] = TOMBSTONE
+        t._tombstones += 1
+        t._size -= 1
+        t._stats.key_removed(h, t._last_probes)
+        return [x]
+
+    def rebuild_stats(self, t: HashStructure) -> None:
+        stats = t._stats
+        for i, slot in enumerate(t.table):
+            if slot is not None:
+                stats.slot_filled(i)
+        keys = [slot for slot in t.table if isinstance(slot, int)]
+        for v, h in zip(keys, t.hash_many(keys)):
+            t._find(v, h)
+            stats.key_added(h, t._last_probes)
+
+    def dump(self, table: List[Any]) -> List[Any]:
+        return [{"t": 1} if x is TOMBSTONE else x for x in table]
+
+    def load(self, datos: Any, capacity: int, key_length: int, trusted: bool = False) -> List[Any]:
+        _check_datos(datos, capacity)
+        if trusted:
+            return [TOMBSTONE if x.__class__ is dict else x for x in datos]
+        table: List[Any] = [None] * capacity
+        for i, x in enumerate(datos):
+            if x is None:
+                continue
+            if isinstance(x, dict) and x.get("t") == 1:
+                table[i] = TOMBSTONE
+            elif isinstance(x, int):
+                table[i] = _check_key(x, key_length)
+            else:
+                raise ValueError("Elemento de datos inválido en archivo")
+        return table
+
+
+@register_collision
+class LinearProbing(OpenAddressing):
+    name = "secuencial"
+
+    def probe(self, h: int, capacity: int) -> Iterator[int]:
+        return ((h + i) % capacity for i in range(capacity))
+
+
+@register_collision
+class DoubleStepProbing(OpenAddressing):
+    name = "doble"
+
+    def cycle(self, capacity: int) -> int:
+        # Paso 2: con capacidad par solo se visitan las posiciones de la misma paridad
+        return capacity // math.gcd(2, capacity)
+
+    def probe(self, h: int, capacity: int) -> Iterator[int]:
+        # Avanza de 2 en 2: equivalente a ((hash + 1) mod tamaño) + 1
+        # usando índices 0-based en la tabla.
+        return ((h + 2 * i) % capacity for i in range(self.cycle(capacity)))
+
+
+@register_collision
+class QuadraticProbing(OpenAddressing):
+    name = "cuadrado"
+
+    def cycle(self, capacity: int) -> int:
+        # (i + m/2)^2 ≡ i^2 (mod m) cuando 4 | m
+        return capacity // 2 if capacity % 4 == 0 else capacity
+
+    def probe(self, h: int, capacity: int) -> Iterator[int]:
+        return ((h + i * i) % capacity for i in range(self.cycle(capacity)))
+
+
+@register_collision
+class RobinHoodProbing(OpenAddressing):
+    """Sondeo lineal Robin Hood.
+
+    ``t._aux`` guarda el desplazamiento de cada posición (-1 si está vacía).
+    Al insertar, la clave que viene de más lejos se queda con la posición; la
+    búsqueda se corta al pasar una clave más cercana a su base que el sondeo
+    actual, y el borrado corre hacia atrás las claves siguientes en lugar de
+    dejar una marca de borrado.
+    """
+
+    name = "robinhood"
+
+    def probe(self, h: int, capacity: int) -> Iterator[int]:
+        return ((h + i) % capacity for i in range(capacity))
+
+    def attach(self, t: HashStructure) -> None:
+        dist = array("i", [-1]) * t.capacity
+        table = t.table
+        positions = [i for i, x in enumerate(table) if isinstance(x, int)]
+        homes = t.hash_many([table[i] for i in positions])
+        for i, h in zip(positions, homes):
+            dist[i] = (i - h) % t.capacity
+        t._aux = dist
+
+    def clone(self, t: HashStructure) -> Tuple[List[Any], Any]:
+        return list(t.table), t._aux[:]
+
+    def find(self, t: HashStructure, value: int, h: int) -> int:
+        table, dist, cap = t.table, t._aux, t.capacity
+        idx = h
+        for d in range(cap):
+            slot = table[idx]
+            if slot is None or dist[idx] < d:
+                t._last_probes = d + 1
+                return -1
+            if slot == value:
+                t._last_probes = d + 1
+                return idx
+            idx = idx + 1 if idx + 1 < cap else 0
+        t._last_probes = cap
+        return -1
+
+    def insert(self, t: HashStructure, value: int, h: int) -> Tuple[int, Optional[int], int]:
+        if t._size >= t.capacity:
+            raise TableFullError("La estructura está llena")
+        table, dist, cap, stats = t.table, t._aux, t.capacity, t._stats
+        idx = h
+        cur, cur_d = value, 0
+        moved_from = 0  # sondeos originales de la clave desplazada que se lleva
+        placed: Optional[Tuple[int, int]] = None  # (índice, sondeos) de value
+        while True:
+            slot = table[idx]
+            if slot is None:
+                table[idx] = cur
+                dist[idx] = cur_d
+                stats.slot_filled(idx)
+                if placed is None:
+                    placed = (idx, cur_d + 1)
+                else:
+                    stats.key_moved(moved_from, cur_d + 1)
+                break
+            if placed is None and slot == value:
+                raise ValueError("La clave ya existe (duplicada)")
+            if dist[idx] < cur_d:
+                # La clave residente está más cerca de su base: cede la posición
+                if placed is None:
+                    placed = (idx, cur_d + 1)
+                else:
+                    stats.key_moved(moved_from, cur_d + 1)
+                moved_from = dist[idx] + 1
+                table[idx], cur = cur, slot
+                dist[idx], cur_d = cur_d, dist[idx]
+            idx = idx + 1 if idx + 1 < cap else 0
+            cur_d += 1
+        t._size += 1
+        stats.key_added(h, placed[1])
+        return placed[0], (h if placed[1] > 1 else None), placed[1]
+
+    def _shift_back(self, t: HashStructure, idx: int) -> None:
+        """Vacía idx corriendo una posición hacia atrás las claves desplazadas que siguen."""
+        table, dist, cap, stats = t.table, t._aux, t.capacity, t._stats
+        nxt = idx + 1 if idx + 1 < cap else 0
+        while table[nxt] is not None and dist[nxt] > 0:
+            table[idx] = table[nxt]
+            dist[idx] = dist[nxt] - 1
+            stats.key_moved(dist[nxt] + 1, dist[nxt])
+            idx, nxt = nxt, (nxt + 1 if nxt + 1 < cap else 0)
+        table[idx] = None
+        dist[idx] = -1
+        stats.slot_cleared(idx, lambda i: table[i] is not None)
+        t._size -= 1
+
+    def remove(self, t: HashStructure, value: int, idx: int, probes: int) -> None:
+        t._stats.key_removed((idx - t._aux[idx]) % t.capacity, probes)
+        self._shift_back(t, idx)
+
+    def take_bucket(self, t: HashStructure, index: int) -> List[int]:
+        # Al correr hacia atrás pueden entrar claves en index: se vacía del todo.
+        # Las estadísticas se mantienen como en remove (la tabla vieja se sigue usando).
+        table, dist = t.table, t._aux
+        keys: List[int] = []
+        while table[index] is not None:
+            keys.append(table[index])
+            t._stats.key_removed((index - dist[index]) % t.capacity, dist[index] + 1)
+            self._shift_back(t, index)
+        return keys
+
+    def rebuild_stats(self, t: HashStructure) -> None:
+        stats, dist, cap = t._stats, t._aux, t.capacity
+        for i, slot in enumerate(t.table):
+            if slot is not None:
+                stats.slot_filled(i)
+                stats.key_added((i - dist[i]) % cap, dist[i] + 1)
+
+    def load(self, datos: Any, capacity: int, key_length: int, trusted: bool = False) -> List[Any]:
+        # Robin Hood no usa marcas de borrado
+        return _load_slots(datos, capacity, key_length, trusted)
+
+
+class _CuckooState:
+    __slots__ = ("hash2", "stash")
+
+    def __init__(self, hash2: HashFunction):
+        self.hash2 = hash2
+        self.stash: List[int] = []
+
+
+@register_collision
+class CuckooHashing(OpenAddressing):
+    """Cuckoo de una tabla con dos direcciones por clave.
+
+    La primera es la función hash configurada y la segunda la alternativa de
+    ALTERNATE_HASH (modular <-> cuadrado). Si tras ``max_kicks`` expulsiones una
+    clave queda sin lugar va a una reserva pequeña; con la reserva llena se
+    deshacen las expulsiones y se informa tabla llena. Una búsqueda revisa dos
+    posiciones y la reserva. Los índices de la reserva se informan como
+    ``capacidad + posición``.
+    """
+
+    name = "cuckoo"
+    STASH_SIZE = 8
+    ALTERNATE_HASH = {"cuadrado": "modular"}
+
+    def max_kicks(self, capacity: int) -> int:
+        return max(16, 3 * capacity.bit_length())
+
+    def attach(self, t: HashStructure) -> None:
+        alternate = self.ALTERNATE_HASH.get(t.hash_func, "cuadrado")
+        t._aux = _CuckooState(HASH_FUNCTIONS[alternate](t.capacity))
+
+    def clone(self, t: HashStructure) -> Tuple[List[Any], Any]:
+        state = _CuckooState(t._aux.hash2)
+        state.stash = list(t._aux.stash)
+        return list(t.table), state
+
+    def probe(self, h: int, capacity: int) -> Iterator[int]:
+        return iter((h,))
+
+    def _probes_at(self, t: HashStructure, value: int, idx: int) -> int:
+        return 1 if idx == t._hasher(value) else 2
+
+    def find(self, t: HashStructure, value: int, h: int) -> int:
+        table = t.table
+        if table[h] == value:
+            t._last_probes = 1
+            return h
+        h2 = t._aux.hash2(value)
+        if table[h2] == value:
+            t._last_probes = 2
+            return h2
+        stash = t._aux.stash
+        for j, k in enumerate(stash):
+            if k == value:
+                t._last_probes = 3 + j
+                return t.capacity + j
+        t._last_probes = 2 + len(stash)
+        return -1
+
+    def insert(self, t: HashStructure, value: int, h: int) -> Tuple[int, Optional[int], int]:
+        state = t._aux
+        if t._size - len(state.stash) >= t.capacity and len(state.stash) >= self.STASH_SIZE:
+            raise TableFullError("La estructura está llena")
+        if self.find(t, value, h) != -1:
+            raise ValueError("La clave ya existe (duplicada)")
+        table, stats = t.table, t._stats
+        h2 = state.hash2(value)
+        for i, idx in enumerate((h, h2)):
+            if table[idx] is None:
+                table[idx] = value
+                t._size += 1
+                stats.slot_filled(idx)
+                stats.key_added(h, i + 1)
+                return idx, (h if i else None), i + 1
+        # Ambas ocupadas: expulsiones sucesivas empezando por la primera dirección
+        old_probes: Dict[int, int] = {}
+        touched: List[int] = []
+        cur, idx = value, h
+        for _ in range(self.max_kicks(t.capacity)):
+            resident = table[idx]
+            table[idx] = cur
+            touched.append(idx)
+            if resident is None:
+                stats.slot_filled(idx)
+                cur = None
+                break
+            old_probes.setdefault(resident, self._probes_at(t, resident, idx))
+            cur = resident
+            a = t._hasher(cur)
+            idx = state.hash2(cur) if idx == a else a
+        if cur is not None:
+            if len(state.stash) >= self.STASH_SIZE:
+                for idx in reversed(touched):
+                    table[idx], cur = cur, table[idx]
+                raise TableFullError("No se encontró espacio libre (tabla llena)")
+            state.stash.append(cur)
+        # Métricas de las claves que cambiaron de lugar
+        old_probes.pop(value, None)
+        position = t.capacity + len(state.stash) - 1 if cur is not None else -1
+        for idx in set(touched):
+            k = table[idx]
+            if k == value:
+                position = idx
+            elif k in old_probes:
+                stats.key_moved(old_probes.pop(k), self._probes_at(t, k, idx))
+        for k, probes in old_probes.items():  # la que terminó en la reserva
+            stats.key_moved(probes, 2 + len(state.stash))
+        t._size += 1
+        probes = self._probes_at(t, value, position) if position < t.capacity else 2 + len(state.stash)
+        stats.key_added(h, probes)
+        return position, h, len(touched)
+
+    def remove(self, t: HashStructure, value: int, idx: int, probes: int) -> None:
+        stats, state = t._stats, t._aux
+        stats.key_removed(t._hasher(value), probes)
+        t._size -= 1
+        if idx >= t.capacity:
+            j = idx - t.capacity
+            state.stash.pop(j)
+            for later in range(j, len(state.stash)):
+                stats.key_moved(later + 4, later + 3)
+            return
+        t.table[idx] = None
+        stats.slot_cleared(idx, lambda i: t.table[i] is not None)
+        # Una clave de la reserva que tenga esta posición como alternativa vuelve a la tabla
+        for j, k in enumerate(state.stash):
+            if idx == t._hasher(k) or idx == state.hash2(k):
+                state.stash.pop(j)
+                t.table[idx] = k
+                stats.slot_filled(idx)
+                stats.key_moved(3 + j, self._probes_at(t, k, idx))
+                for later in range(j, len(state.stash)):
+                    stats.key_moved(later + 4, later + 3)
+                break
+
+    def take_bucket(self, t: HashStructure, index: int) -> List[int]:
+        # Sin secuencias de sondeo que preservar: la posición queda vacía
+        stats, table = t._stats, t.table
+        x = table[index]
+        keys = [x] if isinstance(x, int) else []
+        if keys:
+            stats.key_removed(t._hasher(x), self._probes_at(t, x, index))
+            table[index] = None
+            stats.slot_cleared(index, lambda i: table[i] is not None)
+        t._size -= len(keys)
+        if index == t.capacity - 1:
+            # Última posición migrada: la reserva se migra junto con ella
+            stash = t._aux.stash
+            for j in range(len(stash) - 1, -1, -1):
+                stats.key_removed(t._hasher(stash[j]), 3 + j)
+            keys.extend(stash)
+            t._size -= len(stash)
+            t._aux.stash = []
+        return keys
+
+    def rebuild_stats(self, t: HashStructure) -> None:
+        stats = t._stats
+        positions = [i for i, x in enumerate(t.table) if isinstance(x, int)]
+        homes = t.hash_many([t.table[i] for i in positions])
+        for i, h in zip(positions, homes):
+            stats.slot_filled(i)
+            stats.key_added(h, 1 if i == h else 2)
+        for j, k in enumerate(t._aux.stash):
+            stats.key_added(t._hasher(k), 3 + j)
+
+    def overflow(self, t: HashStructure) -> List[int]:
+        return list(t._aux.stash)
+
+    def dump_extra(self, t: HashStructure) -> Dict[str, Any]:
+        return {"stash": list(t._aux.stash)} if t._aux.stash else {}
+
+    def load(self, datos: Any, capacity: int, key_length: int, trusted: bool = False) -> List[Any]:
+        return _load_slots(datos, capacity, key_length, trusted)
+
+    def load_extra(self, t: HashStructure, data: Dict[str, Any]) -> None:
+        stash = data.get("stash", [])
+        if not isinstance(stash, list) or len(stash) > self.STASH_SIZE:
+            raise ValueError("Reserva inválida en archivo")
+        stats = t._stats  # se arman sobre la tabla antes de sumar la reserva
+        for k in stash:
+            _check_key(k, int(t.key_length))
+            if self.find(t, k, t._hasher(k)) != -1:
+                raise ValueError("Claves duplicadas en archivo")
+            t._aux.stash.append(k)
+            t._size += 1
+            stats.key_added(t._hasher(k), 2 + len(t._aux.stash))
+
+
+class ChainedStrategy(CollisionStrategy):
+    """Cada posición guarda todas las claves con esa dirección base."""
+
+    chained = True
+
+    def count(self, table: List[Any]) -> Tuple[int, int]:
+        return len(self.keys(table)), 0
+
+    def rebuild_stats(self, t: HashStructure) -> None:
+        stats = t._stats
+        for i in range(t.capacity):
+            for position, _ in enumerate(self.bucket_items(t.table, i), 1):
+                stats.key_added(i, position)
+
+    def dump(self, table: List[Any]) -> List[Any]:
+        return [self.bucket_items(table, i) for i in range(len(table))]
+
+
+class HashedBucket:
+    """Bucket de ``anidados`` promovido: conjunto con orden de inserción sobre un dict.
+
+    Ofrece la parte de la interfaz de lista que usa NestedBuckets, con
+    pertenencia, alta y baja en O(1) en lugar de O(largo).
+    """
+
+    __slots__ = ("_keys",)
+
+    def __init__(self, values: Iterable[int] = ()):
+        self._keys = dict.fromkeys(values)
+
+    def __contains__(self, value: object) -> bool:
+        return value in self._keys
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self._keys)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, (HashedBucket, list)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"HashedBucket({list(self._keys)!r})"
+
+    def append(self, value: int) -> None:
+        self._keys[value] = None
+
+    def remove(self, value: int) -> None:
+        del self._keys[value]
+
+
+@register_collision
+class NestedBuckets(ChainedStrategy):
+    """Un arreglo de claves por posición.
+
+    Como los bins que se "arborizan" en otras tablas hash, un bucket que supera
+    PROMOTE_AT claves pasa a HashedBucket y vuelve a lista al bajar de
+    DEMOTE_AT, así una función hash mala no degrada la búsqueda a O(largo).
+    El orden de inserción (y por lo tanto bucket_items) no cambia.
+    """
+
+    name = "anidados"
+    PROMOTE_AT = 8
+    DEMOTE_AT = 6
+
+    def new_table(self, capacity: int) -> List[Any]:
+        return [[] for _ in range(capacity)]
+
+    def bucket_items(self, table: List[Any], index: int) -> List[int]:
+        bucket = table[index]
+        return list(bucket) if isinstance(bucket, (list, HashedBucket)) else []
+
+    def keys(self, table: List[Any]) -> List[int]:
+        # Los buckets vacíos son falsos: no hace falta pedir cada uno
+        return [v for bucket in table if bucket for v in bucket]
+
+    def clone(self, t: HashStructure) -> Tuple[List[Any], Any]:
+        return [b[:] if type(b) is list else HashedBucket(b) for b in t.table], None
+
+    def find(self, t: HashStructure, value: int, h: int) -> int:
+        bucket = t.table[h]
+        if type(bucket) is HashedBucket:
+            # Una sola consulta al dict, tanto si está como si no
+            t._last_probes = 1
+            return h if value in bucket else -1
+        try:
+            t._last_probes = bucket.index(value) + 1
+            return h
+        except ValueError:
+            t._last_probes = len(bucket)
+            return -1
+
+    def insert(self, t: HashStructure, value: int, h: int) -> Tuple[int, Optional[int], int]:
+        if self.find(t, value, h) != -1:
+            raise ValueError("La clave ya existe (duplicada)")
+        bucket = t.table[h]
+        first_collision_index = h if bucket else None
+        bucket.append(value)
+        if len(bucket) > self.PROMOTE_AT and type(bucket) is list:
+            t.table[h] = HashedBucket(bucket)
+        t._size += 1
+        t._stats.key_added(h, len(bucket))
+        return h, first_collision_index, 1
+
+    def remove(self, t: HashStructure, value: int, idx: int, probes: int) -> None:
+        bucket = t.table[idx]
+        bucket.remove(value)
+        if len(bucket) < self.DEMOTE_AT and type(bucket) is HashedBucket:
+            t.table[idx] = list(bucket)
+        t._size -= 1
+        t._stats.key_removed(idx, probes)
+
+    def take_bucket(self, t: HashStructure, index: int) -> List[int]:
+        keys = list(t.table[index])
+        t.table[index] = []
+        t._size -= len(keys)
+        for _ in keys:
+            t._stats.key_removed(index, 0)
+        return keys
+
+    def load(self, datos: Any, capacity: int, key_length: int, trusted: bool = False) -> List[Any]:
+        _check_datos(datos, capacity)
+        check = _trust_key if trusted else _check_key
+        table: List[Any] = []
+        for x in datos:
+            if x is None:
+                table.append([])
+            elif isinstance(x, list):
+                bucket = [check(v, key_length) for v in x]
+                table.append(HashedBucket(bucket) if len(bucket) > self.PROMOTE_AT else bucket)
+            else:
+                raise ValueError("Elemento de datos inválido en archivo")
+        return table
+
+
+@register_collision
+class SeparateChaining(ChainedStrategy):
+    name = "encadenamiento"
+
+    def new_table(self, capacity: int) -> List[Any]:
+        return [None] * capacity
+
+    def bucket_items(self, table: List[Any], index: int) -> List[int]:
+        arr: List[int] = []
+        node = table[index]
+        while isinstance(node, Node):
+            arr.append(node.value)
+            node = node.next
+        return arr
+
+    def keys(self, table: List[Any]) -> List[int]:
+        keys: List[int] = []
+        for node in table:
+            while node is not None:
+                keys.append(node.value)
+                node = node.next
+        return keys
+
+    def clone(self, t: HashStructure) -> Tuple[List[Any], Any]:
+        table: List[Any] = [None] * t.capacity
+        for i, node in enumerate(t.table):
+            tail = None
+            while node is not None:
+                copy = Node(node.value)
+                if tail is None:
+                    table[i] = copy
+                else:
+                    tail.next = copy
+                tail = copy
+                node = node.next
+        return table, None
+
+    def find(self, t: HashStructure, value: int, h: int) -> int:
+        probes = 0
+        node = t.table[h]
+        while node is not None:
+            probes += 1
+            if node.value == value:
+                t._last_probes = probes
+                return h
+            node = node.next
+        t._last_probes = probes
+        return -1
+
+    def insert(self, t: HashStructure, value: int, h: int) -> Tuple[int, Optional[int], int]:
+        node = t.table[h]
+        if node is None:
+            t.table[h] = Node(value)
+            t._size += 1
+            t._stats.key_added(h, 1)
+            return h, None, 1
+        # Un solo recorrido: busca duplicados y termina en la cola, donde se
+        # agrega para conservar el orden de inserción.
+        length = 1
+        while True:
+            if node.value == value:
+                raise ValueError("La clave ya existe (duplicada)")
+            if node.next is None:
+                break
+            node = node.next
+            length += 1
+        node.next = Node(value)
+        t._size += 1
+        t._stats.key_added(h, length + 1)
+        return h, h, 1
+
+    def remove(self, t: HashStructure, value: int, idx: int, probes: int) -> None:
+        prev: Optional[Node] = None
+        node = t.table[idx]
+        while node is not None:
+            if node.value == value:
+                if prev is None:
+                    t.table[idx] = node.next
+                else:
+                    prev.next = node.next
+                t._size -= 1
+                t._stats.key_removed(idx, probes)
+                return
+            prev, node = node, node.next
+
+    def take_bucket(self, t: HashStructure, index: int) -> List[int]:
+        keys = self.bucket_items(t.table, index)
+        t.table[index] = None
+        t._size -= len(keys)
+        for _ in keys:
+            t._stats.key_removed(index, 0)
+        return keys
+
+    def load(self, datos: Any, capacity: int, key_length: int, trusted: bool = False) -> List[Any]:
+        _check_datos(datos, capacity)
+        check = _trust_key if trusted else _check_key
+        table: List[Any] = []
+        for x in datos:
+            if x is None:
+                table.append(None)
+            elif isinstance(x, list):
+                head: Optional[Node] = None
+                for v in reversed(x):
+                    head = Node(check(v, key_length), head)
+                table.append(head)
+            else:
+                raise ValueError("Elemento de datos inválido en archivo")
+        return table
@@ -1,33 +1,93 @@
 from __future__ import annotations
 
+from array import array
 from dataclasses import dataclass, field
+import bisect
 import json
 import math
 import random
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
 
+from .common import (
+    Snapshot,
+    capacity_limit,
+    checksum_matches,
+    is_power_of_10,
+    json_indent,
+    keys_checksum,
+    restore_snapshot,
+    sample_new_keys,
+    shuffle_keys,
+    take_snapshot,
+    validate_keys,
+)
+from .storage import DEFAULT_STORAGE, KeyStorage, copy_storage, make_storage
 
-def _is_power_of_10(n: int) -> bool:
-    if n <= 0:
-        return False
-    while n % 10 == 0:
-        n //= 10
-    return n == 1
+
+# Huecos tolerados en el índice antes de reconstruirlo
+_REINDEX_MIN = 1024
 
 
 @dataclass
 class LinearStructure:
     capacity: int
     key_length: int
-    items: List[int] = field(default_factory=list)
+    items: KeyStorage = field(default_factory=list)
+    indexed: bool = True  # mantiene un índice valor -> posición para consultas O(1)
+    storage: str = DEFAULT_STORAGE  # 'lista' | 'array' | 'numpy'
+    large: bool = False  # modo grande: capacidades hasta 10^7
+    # valor -> posición contando los huecos de los borrados desde el último reindexado;
+    # _removed guarda esos huecos ordenados, así borrar no renumera lo que sigue
+    _positions: Dict[int, int] = field(default_factory=dict, init=False, repr=False, compare=False)
+    _removed: List[int] = field(default_factory=list, init=False, repr=False, compare=False)
+    _shared: bool = field(default=False, init=False, repr=False, compare=False)  # items compartido con un snapshot
+
+    _SNAPSHOT_FIELDS = ("capacity", "key_length", "items", "indexed", "storage", "large", "_positions", "_removed")
 
     def __post_init__(self):
         if not isinstance(self.capacity, int) or self.capacity <= 0:
             raise ValueError("Capacidad inválida")
-        if self.capacity > 10000 or not _is_power_of_10(self.capacity):
-            raise ValueError("La capacidad debe ser potencia de 10 y ≤ 10000")
+        limit = capacity_limit(self.large)
+        if self.capacity > limit or not is_power_of_10(self.capacity):
+            raise ValueError(f"La capacidad debe ser potencia de 10 y ≤ {limit}")
         if not (1 <= int(self.key_length) <= 9):
             raise ValueError("Longitud de clave inválida (1-9)")
+        if self.storage == "bloques":
+            raise ValueError("El backend 'bloques' requiere claves ordenadas")
+        self.items = make_storage(self.items, self.storage)
+        self._rebuild_index()
+
+    # Índice de pertenencia
+    def _rebuild_index(self) -> None:
+        self._positions = {v: i for i, v in enumerate(self.items)} if self.indexed else {}
+        self._removed = []
+
+    def _index_of(self, value: int) -> int:
+        pos = self._positions.get(value)
+        if pos is None:
+            return -1
+        return pos - bisect.bisect_left(self._removed, pos)
+
+    def __contains__(self, value: int) -> bool:
+        if self.indexed:
+            return value in self._positions
+        return value in self.items
+
+    # Snapshots con copia al escribir
+    def snapshot(self) -> Snapshot:
+        """Estado actual en O(1); la próxima escritura copia el almacenamiento."""
+        return take_snapshot(self, self._SNAPSHOT_FIELDS)
+
+    def restore(self, snapshot: Snapshot) -> None:
+        """Vuelve al estado de ``snapshot`` en O(1)."""
+        restore_snapshot(self, snapshot)
+
+    def _before_write(self) -> None:
+        if self._shared:
+            self.items = copy_storage(self.items)
+            self._positions = dict(self._positions)
+            self._removed = list(self._removed)
+            self._shared = False
 
     # Operaciones básicas
     @property
@@ -42,66 +102,79 @@ class LinearStructure:
             raise ValueError("La estructura está llena")
         if not self._valid_key(value):
             raise ValueError("La clave no cumple la longitud configurada")
-        if value in self.items:
+        if value in self:
             raise ValueError("La clave ya existe (duplicada)")
+        self._before_write()
         self.items.append(value)
-        return len(self.items) - 1
+        idx = len(self.items) - 1
+        if self.indexed:
+            self._positions[value] = idx + len(self._removed)
+        return idx
 
     def find(self, value: int) -> int:
+        if self.indexed:
+            return self._index_of(value)
+        return self.linear_search(value)[0]
+
+    def linear_search(self, value: int) -> Tuple[int, int]:
+        """Recorrido secuencial real: devuelve (índice, comparaciones)."""
         for i, v in enumerate(self.items):
             if v == value:
-                return i
-        return -1
+                return i, i + 1
+        return -1, len(self.items)
 
     def delete(self, value: int) -> int:
         idx = self.find(value)
         if idx == -1:
             raise ValueError("La clave no existe")
+        self._before_write()
         self.items.pop(idx)
+        if self.indexed:
+            bisect.insort(self._removed, self._positions.pop(value))
+            # Con muchos huecos se reindexa (costo amortizado O(1) por borrado)
+            if len(self._removed) > max(_REINDEX_MIN, len(self.items) // 8):
+                self._rebuild_index()
         return idx
 
     # Serialización
     def to_dict(self) -> Dict[str, Any]:
+        datos = list(self.items)
         return {
             "tipo": "lineal",
             "capacidad": self.capacity,
             "longitud_clave": int(self.key_length),
-            "datos": list(self.items),
+            "datos": datos,
+            "suma_control": keys_checksum(("lineal", self.capacity, int(self.key_length)), datos),
+            **({"modo_grande": True} if self.large else {}),
         }
 
     def to_json(self) -> str:
-        return json.dumps(self.to_dict(), ensure_ascii=False, indent=2)
+        return json.dumps(self.to_dict(), ensure_ascii=False, indent=json_indent(self.large))
 
     @staticmethod
-    def from_dict(data: Dict[str, Any]) -> "LinearStructure":
+    def from_dict(data: Dict[str, Any], trusted: bool = False) -> "LinearStructure":
+        """Con ``trusted``, un archivo cuya 'suma_control' coincide se carga sin validar las claves."""
         if not isinstance(data, dict) or data.get("tipo") != "lineal":
             raise ValueError("Archivo incompatible: 'tipo' debe ser 'lineal'")
         capacidad = data.get("capacidad")
         klen = data.get("longitud_clave")
         datos = data.get("datos")
+        large = bool(data.get("modo_grande", False))
         if not isinstance(capacidad, int) or capacidad <= 0:
             raise ValueError("Capacidad inválida en archivo")
-        if capacidad > 10000 or not _is_power_of_10(capacidad):
-            raise ValueError("Capacidad debe ser potencia de 10 y ≤ 10000")
+        limit = capacity_limit(large)
+        if capacidad > limit or not is_power_of_10(capacidad):
+            raise ValueError(f"Capacidad debe ser potencia de 10 y ≤ {limit}")
         if not isinstance(klen, int) or not (1 <= klen <= 9):
             raise ValueError("Longitud de clave inválida en archivo")
-        if not isinstance(datos, list):
+        if not isinstance(datos, (list, array)):  # array: formato binario
             raise ValueError("Estructura de datos inválida en archivo")
-        vistos = set()
-        for x in datos:
-            if not isinstance(x, int):
-                raise ValueError("Los datos deben ser enteros")
-            if len(str(abs(x))) != klen:
-                raise ValueError("Clave con longitud no compatible")
-            if x in vistos:
-                raise ValueError("Claves duplicadas en archivo")
-            vistos.add(x)
-        if len(datos) > capacidad:
-            raise ValueError("'datos' excede la capacidad")
-        return LinearStructure(capacidad, klen, list(datos))
+        if not (trusted and checksum_matches(data, ("lineal", capacidad, klen))):
+            datos = validate_keys(datos, klen, capacidad)
+        return LinearStructure(capacidad, klen, datos, large=large)
 
     # Generación aleatoria
-    def generate_random(self, count: int) -> int:
+    def generate_random(self, count: int, seed: Optional[int] = None) -> int:
         if count <= 0:
             return 0
         remaining_capacity = self.capacity - len(self.items)
@@ -109,19 +182,15 @@ class LinearStructure:
             return 0
         to_add = min(count, remaining_capacity)
 
-        k = int(self.key_length)
-        min_val = 0 if k == 1 else 10 ** (k - 1)
-        max_val = 10 ** k - 1
-
-        existing = set(self.items)
-        added = 0
-        # Use random sampling with rejection to avoid duplicates
-        while added < to_add:
-            val = random.randint(min_val, max_val)
-            if val in existing:
-                continue
-            self.items.append(val)
-            existing.add(val)
-            added += 1
-        return added
+        rng = random.Random(seed)
+        existing = sorted(self._positions) if self.indexed else sorted(self.items)
+        new_keys = sample_new_keys(self.key_length, existing, to_add, rng)
+        # La muestra sale ordenada; en la estructura lineal se agrega en orden aleatorio
+        shuffle_keys(new_keys, rng)
+        self._before_write()
+        start = len(self.items) + len(self._removed)
+        self.items.extend(new_keys)
+        if self.indexed:
+            self._positions.update(zip(new_keys, range(start, start + len(new_keys))))
+        return len(new_keys)
 
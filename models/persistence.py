@@ -0,0 +1,200 @@
+"""Formato binario compacto (.cc2) para las estructuras de claves.
+
+Guarda el mismo diccionario que ``to_dict`` con 'datos' empaquetado:
+
+    MAGIC | versión u16 | reservado u16 | largo de metadatos u32
+    metadatos JSON (utf-8): to_dict() sin 'datos' + lista de secciones
+    secciones alineadas a 8 bytes, enteros int32 little-endian
+
+Según la estructura, 'datos' se guarda como:
+    - listas de claves: ``claves``
+    - hash de una clave por posición: ``valores`` más los mapas de bits
+      ``vacias`` y ``borradas`` (bit i = posición i)
+    - hash con buckets: ``desplazamientos`` (capacidad + 1) y ``claves``
+
+Al ser de ancho fijo y alineado, el archivo se lee con mmap copiando cada
+sección de una vez, sin parsear clave por clave.
+"""
+from __future__ import annotations
+
+from array import array
+import json
+import mmap
+import os
+import struct
+import sys
+from typing import Any, Dict, List, Tuple
+
+try:  # NumPy es opcional: acelera la lectura de los mapas de bits
+    import numpy as np
+except ImportError:  # pragma: no cover - depende del entorno
+    np = None
+
+from .hash_strategies import COLLISION_STRATEGIES
+from .storage import KEY_TYPECODE
+
+
+MAGIC = b"CC2\x00"
+VERSION = 1
+EXTENSION = ".cc2"
+_HEADER = struct.Struct("<4sHHI")  # magic, versión, reservado, largo de metadatos
+_ALIGN = 8
+
+
+def is_binary_path(path: str) -> bool:
+    return os.path.splitext(path)[1].lower() == EXTENSION
+
+
+def _aligned(n: int) -> int:
+    return -(-n // _ALIGN) * _ALIGN
+
+
+def _pack_keys(values: Any) -> bytes:
+    data = array(KEY_TYPECODE, values)
+    if sys.byteorder == "big":
+        data.byteswap()
+    return data.tobytes()
+
+
+def _unpack_keys(buf: Any) -> array:
+    if len(buf) % 4:
+        raise ValueError("Sección de claves truncada")
+    data = array(KEY_TYPECODE)
+    data.frombytes(buf)
+    if sys.byteorder == "big":
+        data.byteswap()
+    return data
+
+
+def _bit_positions(bitmap: bytes, count: int) -> List[int]:
+    """Índices de los bits en 1 de un mapa de bits (bit i = byte i // 8, bit i % 8)."""
+    if np is not None:
+        bits = np.unpackbits(np.frombuffer(bitmap, dtype=np.uint8), bitorder="little")[:count]
+        return np.flatnonzero(bits).tolist()
+    text = format(int.from_bytes(bitmap, "little"), "b")[::-1][:count]
+    positions: List[int] = []
+    i = text.find("1")
+    while i != -1:
+        positions.append(i)
+        i = text.find("1", i + 1)
+    return positions
+
+
+def _hash_layout(data: Dict[str, Any]) -> bool:
+    """True si la tabla hash usa buckets; falla si la colisión no existe."""
+    strategy = COLLISION_STRATEGIES.get(data.get("colision"))  # type: ignore[arg-type]
+    if strategy is None:
+        raise ValueError("Colisión inválida en archivo")
+    return strategy.chained
+
+
+def _encode_datos(data: Dict[str, Any]) -> List[Tuple[str, bytes]]:
+    datos = data["datos"]
+    if data.get("tipo") != "hash":
+        return [("claves", _pack_keys(datos))]
+    if _hash_layout(data):
+        offsets = [0]
+        flat: List[int] = []
+        for bucket in datos:
+            flat.extend(bucket or ())
+            offsets.append(len(flat))
+        return [("desplazamientos", _pack_keys(offsets)), ("claves", _pack_keys(flat))]
+    empty = bytearray((len(datos) + 7) // 8)
+    dead = bytearray(len(empty))
+    for i, x in enumerate(datos):
+        if x is None:
+            empty[i >> 3] |= 1 << (i & 7)
+        elif not isinstance(x, int):  # marca de borrado ({"t": 1})
+            dead[i >> 3] |= 1 << (i & 7)
+    values = [x if isinstance(x, int) else 0 for x in datos]
+    return [("valores", _pack_keys(values)), ("vacias", bytes(empty)), ("borradas", bytes(dead))]
+
+
+def _decode_datos(meta: Dict[str, Any], sections: Dict[str, Any]) -> Any:
+    try:
+        if meta.get("tipo") != "hash":
+            return _unpack_keys(sections["claves"])
+        if _hash_layout(meta):
+            offsets = _unpack_keys(sections["desplazamientos"]).tolist()
+            flat = _unpack_keys(sections["claves"]).tolist()
+            return [flat[a:b] for a, b in zip(offsets, offsets[1:])]
+        values = _unpack_keys(sections["valores"]).tolist()
+        empty, dead = bytes(sections["vacias"]), bytes(sections["borradas"])
+        if len(empty) * 8 < len(values) or len(dead) * 8 < len(values):
+            raise ValueError("Mapa de bits truncado")
+        datos: List[Any] = values
+        for i in _bit_positions(empty, len(values)):
+            datos[i] = None
+        for i in _bit_positions(dead, len(values)):
+            datos[i] = {"t": 1}
+        return datos
+    except KeyError as e:
+        raise ValueError(f"Falta la sección {e} en el archivo") from None
+
+
+def dump_binary(data: Dict[str, Any], path: str) -> None:
+    """Escribe un diccionario de ``to_dict`` en formato binario."""
+    sections = _encode_datos(data)
+    meta = {k: v for k, v in data.items() if k != "datos"}
+    meta["secciones"] = [[name, len(buf)] for name, buf in sections]
+    meta_bytes = json.dumps(meta, ensure_ascii=False).encode("utf-8")
+    with open(path, "wb") as f:
+        head = _HEADER.pack(MAGIC, VERSION, 0, len(meta_bytes)) + meta_bytes
+        f.write(head + bytes(_aligned(len(head)) - len(head)))
+        for _, buf in sections:
+            f.write(buf + bytes(_aligned(len(buf)) - len(buf)))
+
+
+def load_binary(path: str) -> Dict[str, Any]:
+    """Lee un archivo binario y devuelve el diccionario para ``from_dict``.
+
+    Para las listas de claves 'datos' es un ``array`` de int32.
+    """
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size < _HEADER.size:
+            raise ValueError("Archivo binario inválido")
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            magic, version, _, meta_len = _HEADER.unpack_from(mm, 0)
+            if magic != MAGIC:
+                raise ValueError("Archivo binario inválido")
+            if version != VERSION:
+                raise ValueError(f"Versión de formato no soportada: {version}")
+            pos = _HEADER.size + meta_len
+            if pos > len(mm):
+                raise ValueError("Archivo binario truncado")
+            meta = json.loads(mm[_HEADER.size : pos].decode("utf-8"))
+            if not isinstance(meta, dict) or not isinstance(meta.get("secciones"), list):
+                raise ValueError("Metadatos inválidos en archivo")
+            view = memoryview(mm)
+            sections: Dict[str, memoryview] = {}
+            try:
+                pos = _aligned(pos)
+                for name, size in meta.pop("secciones"):
+                    if pos + size > len(mm):
+                        raise ValueError("Archivo binario truncado")
+                    sections[name] = view[pos : pos + size]
+                    pos = _aligned(pos + size)
+                meta["datos"] = _decode_datos(meta, sections)
+            finally:
+                # El mmap no se puede cerrar mientras queden vistas sobre él
+                for section in sections.values():
+                    section.release()
+                view.release()
+    return meta
+
+
+def save_structure(structure: Any, path: str) -> None:
+    """Guarda en JSON o en binario según la extensión de ``path``."""
+    if is_binary_path(path):
+        dump_binary(structure.to_dict(), path)
+    else:
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(structure.to_json())
+
+
+def load_data(path: str) -> Dict[str, Any]:
+    """Diccionario para ``from_dict`` leído de JSON o binario según la extensión."""
+    if is_binary_path(path):
+        return load_binary(path)
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
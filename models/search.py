@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import bisect
+from typing import Callable, Dict, Optional, Sequence, Tuple
+
+from .storage import KeyStorage, SortedBlocks
+
+
+# Cada algoritmo devuelve (posición de bisect_left, sondeos); un sondeo es una
+# lectura de clave de la secuencia ordenada.
+SearchFunction = Callable[[Sequence[int], int, int, Optional[int]], Tuple[int, int]]
+
+
+def binary_search(keys: Sequence[int], value: int, lo: int = 0, hi: Optional[int] = None) -> Tuple[int, int]:
+    hi = len(keys) if hi is None else hi
+    pos = bisect.bisect_left(keys, value, lo, hi)
+    # El recorrido de bisect_left queda determinado por el resultado: se repite
+    # solo con índices para contar los sondeos sin volver a leer claves.
+    probes = 0
+    while lo < hi:
+        mid = (lo + hi) // 2
+        probes += 1
+        if mid < pos:
+            lo = mid + 1
+        else:
+            hi = mid
+    return pos, probes
+
+
+def interpolation_search(keys: Sequence[int], value: int, lo: int = 0, hi: Optional[int] = None) -> Tuple[int, int]:
+    """Estima la posición por la proporción entre los extremos del rango.
+
+    Si una estimación no reduce el rango a la mitad se intercala un paso
+    binario, así el peor caso sigue siendo O(log n).
+    """
+    hi = len(keys) if hi is None else hi
+    if lo >= hi:
+        return lo, 0
+    lo_key = keys[lo]
+    if value <= lo_key:
+        return lo, 1
+    hi -= 1
+    hi_key = keys[hi]
+    probes = 2
+    if value > hi_key:
+        return hi + 1, probes
+    # Invariante: keys[lo] < value <= keys[hi]
+    while hi - lo > 1:
+        span = hi - lo
+        pos = lo + (value - lo_key) * span // (hi_key - lo_key)
+        pos = min(max(pos, lo + 1), hi - 1)
+        key = keys[pos]
+        probes += 1
+        if key == value:
+            return pos, probes
+        if key < value:
+            lo, lo_key = pos, key
+        else:
+            hi, hi_key = pos, key
+        if hi - lo > span // 2 and hi - lo > 1:
+            mid = (lo + hi) // 2
+            key = keys[mid]
+            probes += 1
+            if key < value:
+                lo, lo_key = mid, key
+            else:
+                hi, hi_key = mid, key
+    return hi, probes
+
+
+def exponential_search(keys: Sequence[int], value: int, lo: int = 0, hi: Optional[int] = None) -> Tuple[int, int]:
+    """Galopa desde ``lo`` con saltos 1, 2, 4... y termina con búsqueda binaria."""
+    hi = len(keys) if hi is None else hi
+    probes = 0
+    start, idx, step = lo, lo, 1
+    while idx < hi:
+        probes += 1
+        if keys[idx] >= value:
+            break
+        start = idx + 1
+        idx = lo + step
+        step *= 2
+    pos, more = binary_search(keys, value, start, min(idx, hi))
+    return pos, probes + more
+
+
+SEARCH_METHODS: Dict[str, SearchFunction] = {
+    "binaria": binary_search,
+    "interpolacion": interpolation_search,
+    "exponencial": exponential_search,
+}
+
+
+def search_keys(items: KeyStorage, value: int, method: str = "binaria") -> Tuple[int, int]:
+    """(posición de bisect_left, sondeos) de ``value`` en claves ordenadas."""
+    search = SEARCH_METHODS[method]
+    if isinstance(items, SortedBlocks):
+        return items.search(value, search)
+    return search(items, value, 0, None)
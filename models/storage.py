@@ -0,0 +1,506 @@
+from __future__ import annotations
+
+from array import array
+import bisect
+from itertools import batched, chain
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from typing import Iterable, Iterator, List, Optional, Tuple, Union
+
+try:  # NumPy es opcional: si no está disponible se usa array
+    import numpy as np
+except ImportError:  # pragma: no cover - depende del entorno
+    np = None
+
+
+# Las claves tienen como máximo 9 dígitos, por lo que caben en 32 bits con signo.
+KEY_TYPECODE = "i"
+
+STORAGE_BACKENDS = ("lista", "array", "numpy", "bloques", "disco")
+DEFAULT_STORAGE = "array"
+
+
+class NumpyKeys:
+    """Búfer de enteros de 32 bits sobre NumPy con la interfaz de lista usada por los modelos."""
+
+    __slots__ = ("_buf", "_n")
+
+    def __init__(self, values: Iterable[int] = ()):
+        data = np.fromiter(values, dtype=np.int32)
+        self._buf = data if len(data) else np.empty(16, dtype=np.int32)
+        self._n = len(data)
+
+    def _reserve(self, extra: int) -> None:
+        need = self._n + extra
+        if need > len(self._buf):
+            grown = np.empty(max(need, 2 * len(self._buf), 16), dtype=np.int32)
+            grown[: self._n] = self._buf[: self._n]
+            self._buf = grown
+
+    def __len__(self) -> int:
+        return self._n
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return self._buf[: self._n][i].tolist()
+        if i < 0:
+            i += self._n
+        if not 0 <= i < self._n:
+            raise IndexError("índice fuera de rango")
+        return int(self._buf[i])
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self._buf[: self._n].tolist())
+
+    def __contains__(self, value: object) -> bool:
+        return bool((self._buf[: self._n] == value).any())
+
+    def __eq__(self, other: object) -> bool:
+        try:
+            return list(self) == list(other)  # type: ignore[call-overload]
+        except TypeError:
+            return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"NumpyKeys({self.tolist()!r})"
+
+    def append(self, value: int) -> None:
+        self._reserve(1)
+        self._buf[self._n] = value
+        self._n += 1
+
+    def extend(self, values: Iterable[int]) -> None:
+        extra = np.fromiter(values, dtype=np.int32)
+        self._reserve(len(extra))
+        self._buf[self._n : self._n + len(extra)] = extra
+        self._n += len(extra)
+
+    def insert(self, i: int, value: int) -> None:
+        i = max(0, min(i, self._n))
+        self._reserve(1)
+        self._buf[i + 1 : self._n + 1] = self._buf[i : self._n]
+        self._buf[i] = value
+        self._n += 1
+
+    def pop(self, i: int = -1) -> int:
+        if i < 0:
+            i += self._n
+        if not 0 <= i < self._n:
+            raise IndexError("índice fuera de rango")
+        value = int(self._buf[i])
+        self._buf[i : self._n - 1] = self._buf[i + 1 : self._n]
+        self._n -= 1
+        return value
+
+    def index(self, value: int) -> int:
+        hits = np.flatnonzero(self._buf[: self._n] == value)
+        if not len(hits):
+            raise ValueError(f"{value} no está en la estructura")
+        return int(hits[0])
+
+    def tolist(self) -> List[int]:
+        return self._buf[: self._n].tolist()
+
+    def copy(self) -> "NumpyKeys":
+        other = NumpyKeys.__new__(NumpyKeys)
+        other._buf = self._buf[: max(self._n, 16)].copy()
+        other._n = self._n
+        return other
+
+    @property
+    def nbytes(self) -> int:
+        return int(self._buf.nbytes)
+
+
+class SortedBlocks:
+    """Lista ordenada repartida en bloques, al estilo de sortedcontainers.
+
+    Insertar o borrar desplaza solo las claves de un bloque (a lo sumo
+    ``2 * LOAD``) en lugar de toda la lista. ``_maxes`` guarda la última clave
+    de cada bloque para ubicarlo por bisección, y un árbol de Fenwick sobre
+    los largos de los bloques traduce entre índice global y (bloque, posición)
+    en O(log bloques). Solo sirve para claves ordenadas.
+    """
+
+    LOAD = 1000
+    __slots__ = ("_blocks", "_maxes", "_tree", "_len")
+
+    def __init__(self, values: Iterable[int] = ()):
+        data = list(values)
+        self._blocks: List[List[int]] = [data[i : i + self.LOAD] for i in range(0, len(data), self.LOAD)]
+        self._maxes: List[int] = [b[-1] for b in self._blocks]
+        self._tree: Optional[List[int]] = None  # se reconstruye al cambiar la cantidad de bloques
+        self._len = len(data)
+
+    # Árbol de Fenwick de los largos de bloque
+    def _index(self) -> List[int]:
+        if self._tree is None:
+            tree = [0, *map(len, self._blocks)]
+            n = len(self._blocks)
+            for i in range(1, n + 1):
+                j = i + (i & -i)
+                if j <= n:
+                    tree[j] += tree[i]
+            self._tree = tree
+        return self._tree
+
+    def _grow(self, b: int, delta: int) -> None:
+        if self._tree is None:
+            return
+        tree, i = self._tree, b + 1
+        while i < len(tree):
+            tree[i] += delta
+            i += i & -i
+
+    def _offset(self, b: int) -> int:
+        """Índice global de la primera clave del bloque ``b``."""
+        tree, total = self._index(), 0
+        while b:
+            total += tree[b]
+            b -= b & -b
+        return total
+
+    def _locate(self, i: int) -> Tuple[int, int]:
+        tree = self._index()
+        b, step = 0, 1 << (len(tree) - 1).bit_length()
+        while step:
+            nb = b + step
+            if nb < len(tree) and tree[nb] <= i:
+                b = nb
+                i -= tree[nb]
+            step >>= 1
+        return b, i
+
+    def _position(self, i: int) -> int:
+        if i < 0:
+            i += self._len
+        if not 0 <= i < self._len:
+            raise IndexError("índice fuera de rango")
+        return i
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            start, stop, step = i.indices(self._len)
+            if step != 1:
+                return self.tolist()[i]
+            if start >= stop:
+                return []
+            b, j = self._locate(start)
+            out: List[int] = []
+            while len(out) < stop - start:
+                out.extend(self._blocks[b][j : j + stop - start - len(out)])
+                b, j = b + 1, 0
+            return out
+        b, j = self._locate(self._position(i))
+        return self._blocks[b][j]
+
+    def __iter__(self) -> Iterator[int]:
+        return chain.from_iterable(self._blocks)
+
+    def __contains__(self, value: object) -> bool:
+        b = bisect.bisect_left(self._maxes, value)
+        if b == len(self._maxes):
+            return False
+        block = self._blocks[b]
+        j = bisect.bisect_left(block, value)
+        return block[j] == value
+
+    def __eq__(self, other: object) -> bool:
+        try:
+            return list(self) == list(other)  # type: ignore[call-overload]
+        except TypeError:
+            return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"SortedBlocks({self.tolist()!r})"
+
+    def bisect_left(self, value: int) -> int:
+        """Como bisect.bisect_left, ubicando primero el bloque."""
+        b = bisect.bisect_left(self._maxes, value)
+        if b == len(self._maxes):
+            return self._len
+        return self._offset(b) + bisect.bisect_left(self._blocks[b], value)
+
+    def search(self, value: int, search) -> Tuple[int, int]:
+        """Como bisect_left pero con ``search`` (ver models.search), sumando los sondeos."""
+        b, probes = search(self._maxes, value, 0, None)
+        if b == len(self._maxes):
+            return self._len, probes
+        j, more = search(self._blocks[b], value, 0, None)
+        return self._offset(b) + j, probes + more
+
+    def insert(self, i: int, value: int) -> None:
+        if not self._blocks:
+            self._blocks.append([value])
+            self._maxes.append(value)
+            self._tree = None
+        else:
+            if i >= self._len:
+                b, j = len(self._blocks) - 1, len(self._blocks[-1])
+            else:
+                b, j = self._locate(max(0, i))
+            block = self._blocks[b]
+            block.insert(j, value)
+            self._maxes[b] = block[-1]
+            self._grow(b, 1)
+            if len(block) > 2 * self.LOAD:
+                self._blocks[b : b + 1] = [block[: self.LOAD], block[self.LOAD :]]
+                self._maxes[b : b + 1] = [block[self.LOAD - 1], block[-1]]
+                self._tree = None
+        self._len += 1
+
+    def append(self, value: int) -> None:
+        self.insert(self._len, value)
+
+    def extend(self, values: Iterable[int]) -> None:
+        for value in values:
+            self.append(value)
+
+    def pop(self, i: int = -1) -> int:
+        b, j = self._locate(self._position(i))
+        block = self._blocks[b]
+        value = block.pop(j)
+        self._len -= 1
+        self._grow(b, -1)
+        if not block:
+            del self._blocks[b], self._maxes[b]
+            self._tree = None
+            return value
+        self._maxes[b] = block[-1]
+        if len(block) < self.LOAD // 2 and len(self._blocks) > 1:
+            # Bloque muy chico: se une con un vecino (y se vuelve a partir si hace falta)
+            b = b - 1 if b else b
+            merged = self._blocks[b] + self._blocks[b + 1]
+            parts = [merged] if len(merged) <= 2 * self.LOAD else [merged[: len(merged) // 2], merged[len(merged) // 2 :]]
+            self._blocks[b : b + 2] = parts
+            self._maxes[b : b + 2] = [p[-1] for p in parts]
+            self._tree = None
+        return value
+
+    def index(self, value: int) -> int:
+        i = self.bisect_left(value)
+        if i < self._len and self[i] == value:
+            return i
+        raise ValueError(f"{value} no está en la estructura")
+
+    def tolist(self) -> List[int]:
+        return list(self)
+
+    def copy(self) -> "SortedBlocks":
+        other = SortedBlocks.__new__(SortedBlocks)
+        other._blocks = [b[:] for b in self._blocks]
+        other._maxes = self._maxes[:]
+        other._tree = None if self._tree is None else self._tree[:]
+        other._len = self._len
+        return other
+
+    @property
+    def nbytes(self) -> int:
+        return sum(sys.getsizeof(b) for b in self._blocks) + sum(sys.getsizeof(x) for x in self)
+
+
+class BlockFile:
+    """Claves int32 little-endian en un archivo mapeado con mmap.
+
+    Ofrece la interfaz de lista que usan los modelos, pero las claves viven en
+    disco: leer un tramo (un bloque) copia solo esos bytes, e insertar o borrar
+    corre la cola del archivo con ``mmap.move``. El archivo crece al doble
+    cuando se llena.
+
+    Sin ``path`` se usa un archivo temporal que se borra al liberar el objeto.
+    Con ``path`` se abre un archivo existente (solo claves, sin cabecera) y se
+    trabaja sobre él sin cargarlo en memoria; ``close`` lo deja del largo justo.
+    """
+
+    CHUNK = 1 << 16  # claves por lectura/escritura al recorrer o cargar
+    __slots__ = ("_file", "_map", "_n")
+
+    _ITEM = struct.Struct("<i")
+
+    def __init__(self, values: Iterable[int] = (), path: Optional[str] = None):
+        self._map: Optional[mmap.mmap] = None
+        if path is None:
+            self._file = tempfile.TemporaryFile()
+            self._n = 0
+        else:
+            self._file = open(path, "r+b")
+            size = os.fstat(self._file.fileno()).st_size
+            if size % 4:
+                self._file.close()
+                raise ValueError("Archivo de bloques inválido (tamaño no múltiplo de 4)")
+            self._n = size // 4
+        self._resize(max(self._n, 16))
+        self.extend(values)
+
+    def flush(self) -> None:
+        self._map.flush()
+
+    def close(self) -> None:
+        """Cierra el archivo, recortando el espacio reservado para crecer."""
+        if not hasattr(self, "_file") or self._file.closed:
+            return
+        self._map.close()
+        self._file.truncate(4 * self._n)
+        self._file.close()
+
+    def __del__(self) -> None:
+        # Un archivo abierto con ``path`` no debe quedar con el relleno de crecimiento
+        self.close()
+
+    def _resize(self, slots: int) -> None:
+        if self._map is not None:
+            self._map.close()
+        self._file.truncate(slots * 4)
+        self._map = mmap.mmap(self._file.fileno(), slots * 4)
+
+    def _reserve(self, extra: int) -> None:
+        need = self._n + extra
+        slots = len(self._map) // 4
+        if need > slots:
+            self._resize(max(need, 2 * slots))
+
+    def _position(self, i: int) -> int:
+        if i < 0:
+            i += self._n
+        if not 0 <= i < self._n:
+            raise IndexError("índice fuera de rango")
+        return i
+
+    def read(self, start: int, stop: int) -> "array[int]":
+        """Claves de [start, stop), leyendo solo ese tramo del archivo."""
+        start, stop = max(0, start), min(stop, self._n)
+        data = array(KEY_TYPECODE)
+        if start < stop:
+            data.frombytes(self._map[4 * start : 4 * stop])
+            if sys.byteorder == "big":
+                data.byteswap()
+        return data
+
+    def __len__(self) -> int:
+        return self._n
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            start, stop, step = i.indices(self._n)
+            return self.read(start, stop) if step == 1 else self.read(0, self._n)[i]
+        return self._ITEM.unpack_from(self._map, 4 * self._position(i))[0]
+
+    def __iter__(self) -> Iterator[int]:
+        for start in range(0, self._n, self.CHUNK):
+            yield from self.read(start, start + self.CHUNK)
+
+    def __contains__(self, value: object) -> bool:
+        return any(value in self.read(s, s + self.CHUNK) for s in range(0, self._n, self.CHUNK))
+
+    def __eq__(self, other: object) -> bool:
+        try:
+            return list(self) == list(other)  # type: ignore[call-overload]
+        except TypeError:
+            return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"BlockFile({self.tolist()!r})"
+
+    def append(self, value: int) -> None:
+        self._reserve(1)
+        self._ITEM.pack_into(self._map, 4 * self._n, value)
+        self._n += 1
+
+    def extend(self, values: Iterable[int]) -> None:
+        for chunk in batched(values, self.CHUNK):
+            data = array(KEY_TYPECODE, chunk)
+            if sys.byteorder == "big":
+                data.byteswap()
+            self._reserve(len(data))
+            self._map[4 * self._n : 4 * (self._n + len(data))] = data.tobytes()
+            self._n += len(data)
+
+    def insert(self, i: int, value: int) -> None:
+        i = max(0, min(i, self._n))
+        self._reserve(1)
+        self._map.move(4 * (i + 1), 4 * i, 4 * (self._n - i))
+        self._ITEM.pack_into(self._map, 4 * i, value)
+        self._n += 1
+
+    def pop(self, i: int = -1) -> int:
+        i = self._position(i)
+        value = self._ITEM.unpack_from(self._map, 4 * i)[0]
+        self._map.move(4 * i, 4 * (i + 1), 4 * (self._n - i - 1))
+        self._n -= 1
+        return value
+
+    def index(self, value: int) -> int:
+        for start in range(0, self._n, self.CHUNK):
+            chunk = self.read(start, start + self.CHUNK)
+            if value in chunk:
+                return start + chunk.index(value)
+        raise ValueError(f"{value} no está en la estructura")
+
+    def tolist(self) -> List[int]:
+        return self.read(0, self._n).tolist()
+
+    def copy(self) -> "BlockFile":
+        other = BlockFile()
+        other._reserve(self._n)
+        for start in range(0, 4 * self._n, 4 * self.CHUNK):
+            stop = min(start + 4 * self.CHUNK, 4 * self._n)
+            other._map[start:stop] = self._map[start:stop]
+        other._n = self._n
+        return other
+
+    @property
+    def nbytes(self) -> int:
+        """Tamaño del archivo (las claves no ocupan memoria del proceso)."""
+        return len(self._map)
+
+
+KeyStorage = Union[List[int], "array[int]", NumpyKeys, SortedBlocks, BlockFile]
+
+
+def make_storage(values: Iterable[int], backend: str = DEFAULT_STORAGE) -> KeyStorage:
+    """Crea el contenedor de claves para el backend indicado.
+
+    ``numpy`` recurre a ``array`` cuando NumPy no está instalado; ``bloques``
+    espera los valores ya ordenados y ``disco`` los guarda en un archivo
+    temporal mapeado en memoria.
+    """
+    if backend == "lista":
+        return list(values)
+    if backend == "bloques":
+        return SortedBlocks(values)
+    if backend == "disco":
+        return BlockFile(values)
+    if backend == "numpy" and np is not None:
+        return NumpyKeys(values)
+    if backend in {"array", "numpy"}:
+        return array(KEY_TYPECODE, values)
+    raise ValueError("Backend de almacenamiento no soportado")
+
+
+def copy_storage(items: KeyStorage) -> KeyStorage:
+    """Copia independiente del contenedor, con el mismo backend."""
+    if isinstance(items, (NumpyKeys, SortedBlocks, BlockFile)):
+        return items.copy()
+    return items[:]
+
+
+def bisect_keys(items: KeyStorage, value: int) -> int:
+    """bisect_left sobre claves ordenadas de cualquier backend."""
+    if isinstance(items, SortedBlocks):
+        return items.bisect_left(value)
+    return bisect.bisect_left(items, value)
+
+
+def storage_nbytes(items: KeyStorage) -> int:
+    """Bytes aproximados ocupados por las claves (sin contar el objeto contenedor)."""
+    if isinstance(items, array):
+        return items.buffer_info()[1] * items.itemsize
+    if isinstance(items, (NumpyKeys, SortedBlocks, BlockFile)):
+        return items.nbytes
+    return sys.getsizeof(items) + sum(sys.getsizeof(x) for x in items)
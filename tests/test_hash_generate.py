@@ -0,0 +1,54 @@
+import unittest
+
+from models.hash import HashStructure
+from models.hash_strategies import COLLISION_STRATEGIES
+
+
+def _report(t: HashStructure) -> dict:
+    report = t._stats.report()
+    report.pop("fallida")
+    return report
+
+
+def _rebuilt_report(t: HashStructure) -> dict:
+    saved = t._stats_data
+    t._rebuild_stats()
+    report = _report(t)
+    t._stats_data = saved
+    return report
+
+
+class GenerateRandomTest(unittest.TestCase):
+    def test_fills_with_new_keys_and_consistent_stats(self):
+        for name in COLLISION_STRATEGIES:
+            for capacity, count in ((1000, 300), (1000, 1000), (100000, 20000)):
+                with self.subTest(colision=name, capacidad=capacity, claves=count):
+                    s = HashStructure(capacity, 6, "modular", name, large=capacity > 10000)
+                    for k in (100000, 100001, 100002):
+                        s.insert(k)
+                    s.delete(100001)  # deja una marca de borrado en direccionamiento abierto
+                    added = s.generate_random(count, seed=7)
+                    keys = s.keys()
+                    self.assertEqual(len(keys), len(set(keys)))
+                    self.assertEqual(s.size, added + 2)
+                    self.assertIn(100002, keys)
+                    for k in keys[:: max(1, len(keys) // 200)]:
+                        self.assertNotEqual(s.find(k), -1)
+                    self.assertEqual(_report(s), _rebuilt_report(s))
+
+    def test_same_seed_same_table(self):
+        a = HashStructure(10000, 5, "modular", "robinhood")
+        b = HashStructure(10000, 5, "modular", "robinhood")
+        a.generate_random(5000, seed=3)
+        b.generate_random(5000, seed=3)
+        self.assertEqual(a.table, b.table)
+
+    def test_auto_resize_grows(self):
+        s = HashStructure(100, 5, "modular", "secuencial", auto_resize=True)
+        self.assertEqual(s.generate_random(5000, seed=1), 5000)
+        self.assertEqual(s.size, 5000)
+        self.assertEqual(_report(s), _rebuilt_report(s))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+import random
+import unittest
+
+from models.hash import HashStructure
+from models.hash_strategies import COLLISION_STRATEGIES
+
+
+def _report(t: HashStructure) -> dict:
+    report = t._stats.report()
+    report.pop("fallida")  # las búsquedas fallidas no se pueden reconstruir
+    return report
+
+
+def _rebuilt_report(t: HashStructure) -> dict:
+    saved = t._stats_data
+    t._rebuild_stats()
+    report = _report(t)
+    t._stats_data = saved
+    return report
+
+
+class ResizeTest(unittest.TestCase):
+    def test_grow_during_shrink(self):
+        # Tras un achique a 10 las inserciones deben terminarlo y volver a crecer
+        for name in COLLISION_STRATEGIES:
+            with self.subTest(colision=name):
+                s = HashStructure(100, 3, "modular", name, auto_resize=True, migrate_step=8)
+                for k in range(195, 200):
+                    s.insert(k)
+                s.delete(199)
+                self.assertTrue(s.resizing)
+                keys = set(range(195, 199))
+                for k in range(200, 260):
+                    s.insert(k)
+                    keys.add(k)
+                    self.assertEqual(s.size, len(keys))
+                self.assertEqual(sorted(s.keys()), sorted(keys))
+                for k in keys:
+                    self.assertNotEqual(s.find(k), -1)
+
+    def test_migrate_into_full_table(self):
+        # Con max_load > 1 la tabla achicada se llena antes de terminar la migración
+        for name in ("secuencial", "doble", "cuadrado", "robinhood"):
+            with self.subTest(colision=name):
+                s = HashStructure(100, 3, "modular", name, auto_resize=True, max_load=2.0, migrate_step=1)
+                for k in range(195, 200):
+                    s.insert(k)
+                s.delete(199)
+                self.assertEqual(s.capacity, 10)
+                keys = set(range(195, 199))
+                for k in range(200, 215):
+                    s.insert(k)
+                    keys.add(k)
+                self.assertEqual(s.capacity, 100)
+                self.assertEqual(s.size, len(keys))
+                self.assertEqual(sorted(s.keys()), sorted(keys))
+
+    def test_delete_in_old_table_after_migration_steps(self):
+        for name in COLLISION_STRATEGIES:
+            with self.subTest(colision=name):
+                s = HashStructure(10, 2, "modular", name, auto_resize=True, migrate_step=1)
+                for k in range(11, 19):
+                    s.insert(k)
+                s.find(99)
+                s.find(98)
+                s.delete(15)
+                self.assertEqual(s.size, 7)
+                self.assertEqual(sorted(s.keys()), [11, 12, 13, 14, 16, 17, 18])
+
+    def test_stats_match_rebuild_while_migrating(self):
+        for name in COLLISION_STRATEGIES:
+            with self.subTest(colision=name):
+                rng = random.Random(1)
+                s = HashStructure(10, 3, "modular", name, auto_resize=True, migrate_step=1)
+                keys = set()
+                checked = 0
+                for _ in range(600):
+                    k = rng.randrange(100, 1000)
+                    op = rng.random()
+                    if op < 0.55 and k not in keys:
+                        s.insert(k)
+                        keys.add(k)
+                    elif op < 0.8 and keys:
+                        k = rng.choice(sorted(keys))
+                        s.delete(k)
+                        keys.discard(k)
+                    else:
+                        s.find(k)
+                    if s._old is not None:
+                        checked += 1
+                        self.assertEqual(_report(s._old), _rebuilt_report(s._old))
+                    self.assertEqual(_report(s), _rebuilt_report(s))
+                self.assertGreater(checked, 0)
+                self.assertEqual(sorted(s.keys()), sorted(keys))
+
+
+if __name__ == "__main__":
+    unittest.main()
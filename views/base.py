@@ -1,5 +1,18 @@
+from __future__ import annotations
+
+import tkinter.messagebox as mb
+
 import customtkinter as ctk
 
+from models.persistence import EXTENSION
+
+
+# Formatos de "Guardar/Cargar estructura"; el formato se elige por la extensión
+STRUCTURE_FILETYPES = [("JSON", "*.json"), ("Binario compacto", f"*{EXTENSION}"), ("Todos", "*.*")]
+
+# Desde esta cantidad "Generar" avisa cuánto puede tardar (modo grande)
+SLOW_GENERATE = 200_000
+
 
 class BaseContent(ctk.CTkFrame):
     title: str = ""
@@ -12,3 +25,19 @@ class BaseContent(ctk.CTkFrame):
         self.body.grid(row=0, column=0, sticky="nsew", padx=16, pady=16)
         self.body.columnconfigure(0, weight=1)
 
+
+
+def confirm_generate(count: int, seconds_per_million: float) -> bool:
+    """Pide confirmación antes de una generación que bloquea la ventana varios segundos."""
+    if count < SLOW_GENERATE:
+        return True
+    seconds = count / 1_000_000 * seconds_per_million
+    return mb.askyesno("Confirmar", f"Generar {count} claves puede tardar unos {seconds:.0f} s. ¿Continuar?")
+
+
+def visible_range(total: int, limit: int, focus: int | None = None) -> range:
+    """Ventana de como máximo ``limit`` posiciones; se desplaza para incluir ``focus``."""
+    if total <= limit or focus is None or focus < limit:
+        return range(min(total, limit))
+    start = min(max(0, focus - limit // 2), total - limit)
+    return range(start, start + limit)
@@ -1,14 +1,22 @@
 from __future__ import annotations
 
 import customtkinter as ctk
-import json
 import math
 import tkinter.filedialog as fd
 import tkinter.messagebox as mb
 from typing import Optional
 
-from .base import BaseContent
+from .base import STRUCTURE_FILETYPES, BaseContent, visible_range
 from models.binary import BinaryStructure
+from models.common import MAX_CAPACITY
+from models.persistence import load_data, save_structure
+
+
+SEARCH_METHODS = [
+    ("binaria", "Binaria"),
+    ("interpolacion", "Interpolación"),
+    ("exponencial", "Exponencial"),
+]
 
 
 class BinariaContent(BaseContent):
@@ -23,6 +31,7 @@ class BinariaContent(BaseContent):
         self.var_klen = ctk.StringVar(value="4")
         self.var_key = ctk.StringVar()
         self.var_gen_count = ctk.StringVar(value="100")
+        self.var_search = ctk.StringVar(value=SEARCH_METHODS[0][1])
 
         # Layout
         self.body.grid_columnconfigure(0, weight=1)
@@ -35,7 +44,7 @@ class BinariaContent(BaseContent):
         cfg_frame.grid(row=0, column=0, sticky="ew", padx=8, pady=(8, 4))
         cfg_frame.grid_columnconfigure(6, weight=1)
         ctk.CTkLabel(cfg_frame, text="Tamaño (10^n):").grid(row=0, column=0, padx=(8, 6), pady=8, sticky="w")
-        self.exp_menu = ctk.CTkOptionMenu(cfg_frame, values=["1", "2", "3", "4"], variable=self.var_exp)
+        self.exp_menu = ctk.CTkOptionMenu(cfg_frame, values=[str(i) for i in range(1, 8)], variable=self.var_exp)
         self.exp_menu.grid(row=0, column=1, padx=(0, 8), pady=8)
         ctk.CTkLabel(cfg_frame, text="Longitud de clave:").grid(row=0, column=2, padx=(8, 6), pady=8, sticky="w")
         self.klen_menu = ctk.CTkOptionMenu(cfg_frame, values=[str(i) for i in range(1, 10)], variable=self.var_klen)
@@ -60,6 +69,13 @@ class BinariaContent(BaseContent):
         self.btn_buscar.grid(row=0, column=3, padx=(0, 6), pady=8)
         self.btn_eliminar = ctk.CTkButton(ops_frame, text="Eliminar", command=self.on_eliminar, state="disabled")
         self.btn_eliminar.grid(row=0, column=4, padx=(0, 6), pady=8, sticky="w")
+        self.search_menu = ctk.CTkOptionMenu(
+            ops_frame,
+            values=[label for _, label in SEARCH_METHODS],
+            variable=self.var_search,
+            command=self.on_cambiar_busqueda,
+        )
+        self.search_menu.grid(row=0, column=5, padx=(0, 6), pady=8, sticky="w")
 
         # Generacion aleatoria
         gen_frame = ctk.CTkFrame(self.body)
@@ -125,23 +141,27 @@ class BinariaContent(BaseContent):
         self.viewer.delete("1.0", "end")
         cap = self.structure.capacity if self.structure else 0
         items = self.structure.items if self.structure else []
-        mostrar = min(1000, cap)
+        window = visible_range(cap, 1000, highlight_index)
+        offset = 1 if window.start > 0 else 0
         if cap == 0:
             self.viewer.insert("end", "Crea o carga la estructura para visualizar contenido.\n")
         else:
-            for i in range(mostrar):
-                if i < len(items):
-                    val = items[i]
-                    self.viewer.insert("end", f"[{i:>4}]  {val}\n")
-                else:
-                    self.viewer.insert("end", f"[{i:>4}]  -\n")
-            if cap > mostrar:
-                self.viewer.insert("end", f"... ({cap - mostrar} elementos no mostrados)\n")
+            width = max(4, len(str(cap - 1)))
+            lines = []
+            if offset:
+                lines.append(f"... ({window.start} elementos anteriores no mostrados)")
+            shown = items[window.start:window.stop]
+            for i in window:
+                val = shown[i - window.start] if i - window.start < len(shown) else "-"
+                lines.append(f"[{i:>{width}}]  {val}")
+            if cap > window.stop:
+                lines.append(f"... ({cap - window.stop} elementos no mostrados)")
+            self.viewer.insert("end", "\n".join(lines) + "\n")
         try:
             w = getattr(self.viewer, "_textbox", self.viewer)
             w.tag_remove("found", "1.0", "end")
-            if highlight_index is not None and cap > 0 and highlight_index < mostrar:
-                line = highlight_index + 1
+            if highlight_index is not None and cap > 0 and highlight_index in window:
+                line = highlight_index - window.start + offset + 1
                 w.tag_add("found", f"{line}.0", f"{line}.end")
                 try:
                     w.see(f"{line}.0")
@@ -167,7 +187,15 @@ class BinariaContent(BaseContent):
             return False, None, f"La clave debe tener {self.structure.key_length} dígitos."
         return True, val, None
 
+    def _search_key(self) -> str:
+        label = self.var_search.get()
+        return next((key for key, text in SEARCH_METHODS if text == label), "binaria")
+
     # Acciones
+    def on_cambiar_busqueda(self, _label: str):
+        if self.structure is not None:
+            self.structure.search = self._search_key()
+
     def on_crear(self):
         if self.structure is not None:
             if not mb.askyesno("Confirmar", "Esto borrará la estructura actual. ¿Continuar?"):
@@ -179,7 +207,9 @@ class BinariaContent(BaseContent):
             self._error("Parámetros inválidos")
             return
         try:
-            self.structure = BinaryStructure(10 ** exp, klen)
+            self.structure = BinaryStructure(
+                10 ** exp, klen, large=10 ** exp > MAX_CAPACITY, search=self._search_key()
+            )
         except Exception as e:
             self._error(str(e))
             return
@@ -221,11 +251,12 @@ class BinariaContent(BaseContent):
             self._error(err or "")
             return
         idx = self.structure.find(val)  # type: ignore[union-attr]
+        probes = self.structure.last_probes  # type: ignore[union-attr]
         if idx == -1:
-            self._set_estado(f"{val} no encontrado.")
+            self._set_estado(f"{val} no encontrado ({probes} sondeos).")
             self._refresh_view()
         else:
-            self._set_estado(f"{val} encontrado en índice {idx}.")
+            self._set_estado(f"{val} encontrado en índice {idx} ({probes} sondeos).")
             self._refresh_view(highlight_index=idx)
 
     def on_eliminar(self):
@@ -249,13 +280,12 @@ class BinariaContent(BaseContent):
         path = fd.asksaveasfilename(
             title="Guardar estructura",
             defaultextension=".json",
-            filetypes=[("JSON", "*.json")],
+            filetypes=STRUCTURE_FILETYPES,
         )
         if not path:
             return
         try:
-            with open(path, "w", encoding="utf-8") as f:
-                f.write(self.structure.to_json())
+            save_structure(self.structure, path)
             self._set_estado(f"Guardado en {path}.")
         except Exception as e:
             self._error(f"Error al guardar: {e}")
@@ -263,14 +293,13 @@ class BinariaContent(BaseContent):
     def on_cargar(self):
         path = fd.askopenfilename(
             title="Cargar estructura",
-            filetypes=[("JSON", "*.json")],
+            filetypes=STRUCTURE_FILETYPES,
         )
         if not path:
             return
         try:
-            with open(path, "r", encoding="utf-8") as f:
-                data = json.load(f)
-            struct = BinaryStructure.from_dict(data)
+            data = load_data(path)
+            struct = BinaryStructure.from_dict(data, trusted=True)
         except Exception as e:
             self._error(f"Error al cargar: {e}")
             return
@@ -278,6 +307,7 @@ class BinariaContent(BaseContent):
         exp = int(round(math.log10(self.structure.capacity)))
         self.var_exp.set(str(exp))
         self.var_klen.set(str(self.structure.key_length))
+        self.var_search.set(dict(SEARCH_METHODS).get(self.structure.search, SEARCH_METHODS[0][1]))
         self._set_config_enabled(False)
         self._set_controls_enabled(True)
         self._update_counters()
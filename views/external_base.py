@@ -1,20 +1,25 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-import json
 import tkinter as tk
 import tkinter.filedialog as fd
 import tkinter.messagebox as mb
-from typing import Dict, Optional, Tuple, Type, TypeVar
+from typing import Dict, List, Optional, Tuple, Type, TypeVar
 
 import customtkinter as ctk
 
-from .base import BaseContent
+from .base import STRUCTURE_FILETYPES, BaseContent, visible_range
+from models.common import MAX_CAPACITY
 from models.external import ExternalStructureBase
+from models.persistence import load_data, save_structure
 
 
 StructureT = TypeVar("StructureT", bound=ExternalStructureBase)
 
+# Ventana máxima de bloques/registros dibujados (cada celda es un widget)
+MAX_VISIBLE_BLOCKS = 100
+MAX_VISIBLE_ROWS = 100
+
 
 @dataclass
 class HighlightState:
@@ -38,6 +43,7 @@ class ExternalBaseContent(BaseContent):
         self.var_klen = ctk.StringVar(value="4")
         self.var_key = ctk.StringVar()
         self.var_gen_count = ctk.StringVar(value="100")
+        self.var_buffer = ctk.StringVar(value="10")
 
         self.current_highlight: Optional[HighlightState] = None
 
@@ -50,7 +56,7 @@ class ExternalBaseContent(BaseContent):
         # Configuración
         cfg_frame = ctk.CTkFrame(self.body)
         cfg_frame.grid(row=0, column=0, sticky="ew", padx=8, pady=(8, 4))
-        cfg_frame.grid_columnconfigure(6, weight=1)
+        cfg_frame.grid_columnconfigure(8, weight=1)
 
         ctk.CTkLabel(cfg_frame, text="Tamaño (múltiplo de 10):").grid(
             row=0, column=0, padx=(8, 6), pady=8, sticky="w"
@@ -68,8 +74,12 @@ class ExternalBaseContent(BaseContent):
         self.btn_borrar = ctk.CTkButton(cfg_frame, text="Borrar estructura", command=self.on_borrar, state="disabled")
         self.btn_borrar.grid(row=0, column=5, padx=(0, 8), pady=8)
 
+        ctk.CTkLabel(cfg_frame, text="Buffer (bloques):").grid(row=0, column=6, padx=(8, 6), pady=8, sticky="w")
+        self.buffer_entry = ctk.CTkEntry(cfg_frame, textvariable=self.var_buffer, width=60)
+        self.buffer_entry.grid(row=0, column=7, padx=(0, 8), pady=8)
+
         self.lbl_capacidad = ctk.CTkLabel(cfg_frame, text="Capacidad: — | Ocupados: 0 | Bloques: — | Reg/bloque: —")
-        self.lbl_capacidad.grid(row=0, column=6, padx=(8, 8), pady=8, sticky="w")
+        self.lbl_capacidad.grid(row=0, column=8, padx=(8, 8), pady=8, sticky="w")
 
         # Operaciones
         ops_frame = ctk.CTkFrame(self.body)
@@ -112,6 +122,9 @@ class ExternalBaseContent(BaseContent):
         self.btn_cargar = ctk.CTkButton(io_frame, text="Cargar estructura", command=self.on_cargar)
         self.btn_cargar.grid(row=0, column=1, padx=8, pady=8)
 
+        self.lbl_buffer = ctk.CTkLabel(io_frame, text="Buffer: —")
+        self.lbl_buffer.grid(row=0, column=2, padx=(8, 8), pady=8, sticky="e")
+
         # Estado
         self.lbl_estado = ctk.CTkLabel(self.body, text="Listo.")
         self.lbl_estado.grid(row=4, column=0, sticky="ew", padx=16, pady=(4, 0))
@@ -166,6 +179,7 @@ class ExternalBaseContent(BaseContent):
         state = "normal" if enabled else "disabled"
         self.capacity_entry.configure(state=state)
         self.klen_menu.configure(state=state)
+        self.buffer_entry.configure(state=state)
         self.btn_crear.configure(state=state)
         self.btn_borrar.configure(state="normal" if not enabled else "disabled")
 
@@ -179,6 +193,20 @@ class ExternalBaseContent(BaseContent):
             size = self.structure.block_size
             text = f"Capacidad: {cap} | Ocupados: {occ} | Bloques: {blocks} | Reg/bloque: {size}"
         self.lbl_capacidad.configure(text=text)
+        self._update_buffer_counters()
+
+    def _update_buffer_counters(self):
+        if not self.structure:
+            self.lbl_buffer.configure(text="Buffer: —")
+            return
+        pool = self.structure.buffer
+        self.lbl_buffer.configure(
+            text=(
+                f"Buffer: {len(pool)}/{pool.capacity} bloques | Aciertos: {pool.hits} | "
+                f"Lecturas: {pool.misses} ({pool.hit_rate:.0%} aciertos) | "
+                f"Sucios: {pool.dirty} | Escrituras: {pool.writes}"
+            )
+        )
 
     def _refresh_view(self, highlight: Optional[HighlightState] = None):
         for widget in self.blocks_container.winfo_children():
@@ -196,10 +224,10 @@ class ExternalBaseContent(BaseContent):
             self._update_scroll_region()
             return
 
-        blocks = self.structure.get_blocks(fill=True)
-        bases = self.structure.get_block_bases()
-        block_count = len(blocks)
+        block_count = self.structure.block_count
         block_size = self.structure.block_size
+        cols = visible_range(block_count, MAX_VISIBLE_BLOCKS, highlight.block if highlight else None)
+        rows = visible_range(block_size, MAX_VISIBLE_ROWS, highlight.offset if highlight else None)
 
         # Encabezados de filas
         header_font = ctk.CTkFont(weight="bold")
@@ -210,14 +238,24 @@ class ExternalBaseContent(BaseContent):
         ctk.CTkLabel(self.blocks_container, text="Base", font=header_font).grid(
             row=1, column=0, padx=4, pady=2, sticky="e"
         )
-        for r in range(block_size):
+        for r in rows:
             ctk.CTkLabel(self.blocks_container, text=f"R{r + 1}").grid(
-                row=r + 2, column=0, padx=4, pady=2, sticky="e"
+                row=r - rows.start + 2, column=0, padx=4, pady=2, sticky="e"
             )
+        if len(cols) < block_count or len(rows) < block_size:
+            ctk.CTkLabel(
+                self.blocks_container,
+                text=(
+                    f"Mostrando bloques B{cols.start + 1}–B{cols.stop} de {block_count}, "
+                    f"registros R{rows.start + 1}–R{rows.stop} de {block_size}."
+                ),
+                anchor="w",
+            ).grid(row=len(rows) + 2, column=0, columnspan=len(cols) + 1, sticky="w", padx=4, pady=(6, 2))
 
-        # Columnas por bloque
-        for col in range(block_count):
-            self.blocks_container.grid_columnconfigure(col + 1, weight=1)
+        # Columnas por bloque (solo se leen los bloques visibles)
+        for col in cols:
+            grid_col = col - cols.start + 1
+            self.blocks_container.grid_columnconfigure(grid_col, weight=1)
             block_highlight = bool(highlight and highlight.block == col)
             base_fg = self._highlight_color(
                 block_highlight and highlight.highlight_base if highlight else False,
@@ -225,9 +263,11 @@ class ExternalBaseContent(BaseContent):
             )
 
             header = ctk.CTkLabel(self.blocks_container, text=f"B{col + 1}", font=header_font)
-            header.grid(row=0, column=col + 1, padx=4, pady=(0, 4))
+            header.grid(row=0, column=grid_col, padx=4, pady=(0, 4))
 
-            base_val = bases[col]
+            # El visor lee sin pasar por el buffer para no alterar sus contadores
+            block: List[Optional[int]] = list(self.structure.peek_block(col))
+            base_val = block[-1] if block else None
             base_text = self._format_value(base_val)
             base_label = ctk.CTkLabel(
                 self.blocks_container,
@@ -236,9 +276,11 @@ class ExternalBaseContent(BaseContent):
                 corner_radius=6,
                 text_color="black" if base_fg else None,
             )
-            base_label.grid(row=1, column=col + 1, padx=2, pady=2, sticky="nsew")
+            base_label.grid(row=1, column=grid_col, padx=2, pady=2, sticky="nsew")
 
-            for r, value in enumerate(blocks[col]):
+            block.extend([None] * (block_size - len(block)))
+            for r in rows:
+                value = block[r]
                 fg = None
                 text_color = None
                 if block_highlight and highlight and highlight.offset == r:
@@ -251,7 +293,7 @@ class ExternalBaseContent(BaseContent):
                     corner_radius=6,
                     text_color=text_color,
                 )
-                cell.grid(row=r + 2, column=col + 1, padx=2, pady=2, sticky="nsew")
+                cell.grid(row=r - rows.start + 2, column=grid_col, padx=2, pady=2, sticky="nsew")
             self._update_scroll_region()
 
     def _sync_canvas_theme(self):
@@ -319,11 +361,14 @@ class ExternalBaseContent(BaseContent):
         try:
             capacity = int((self.var_capacity.get() or "0").strip())
             klen = int(self.var_klen.get())
+            buffer_blocks = int((self.var_buffer.get() or "0").strip())
         except ValueError:
             self._error("Parámetros inválidos")
             return
         try:
-            self.structure = self.structure_cls(capacity, klen)  # type: ignore[call-arg]
+            self.structure = self.structure_cls(  # type: ignore[call-arg]
+                capacity, klen, large=capacity > MAX_CAPACITY, buffer_blocks=buffer_blocks
+            )
         except Exception as e:
             self._error(str(e))
             return
@@ -367,9 +412,14 @@ class ExternalBaseContent(BaseContent):
             self._error(err or "")
             return
         result = self.structure.find(val)  # type: ignore[union-attr]
+        lecturas = (
+            f" ({self.structure.last_reads} lecturas de bloque, "  # type: ignore[union-attr]
+            f"{self.structure.last_hits} aciertos en buffer)"  # type: ignore[union-attr]
+        )
+        self._update_buffer_counters()
         if result.found:
             self._set_estado(
-                f"Búsqueda {self.search_kind_label}: {val} encontrado en bloque B{result.block + 1}, posición {result.offset + 1}."
+                f"Búsqueda {self.search_kind_label}: {val} encontrado en bloque B{result.block + 1}, posición {result.offset + 1}.{lecturas}"
             )
             self._refresh_view(
                 HighlightState(
@@ -382,7 +432,7 @@ class ExternalBaseContent(BaseContent):
         else:
             if result.block >= 0:
                 self._set_estado(
-                    f"Búsqueda {self.search_kind_label}: {val} no encontrado. Revisado hasta bloque B{result.block + 1}."
+                    f"Búsqueda {self.search_kind_label}: {val} no encontrado. Revisado hasta bloque B{result.block + 1}.{lecturas}"
                 )
                 self._refresh_view(
                     HighlightState(
@@ -394,7 +444,7 @@ class ExternalBaseContent(BaseContent):
                 )
             else:
                 self._set_estado(
-                    f"Búsqueda {self.search_kind_label}: {val} no encontrado."
+                    f"Búsqueda {self.search_kind_label}: {val} no encontrado.{lecturas}"
                 )
                 self._refresh_view()
 
@@ -419,13 +469,12 @@ class ExternalBaseContent(BaseContent):
         path = fd.asksaveasfilename(
             title="Guardar estructura",
             defaultextension=".json",
-            filetypes=[("JSON", "*.json")],
+            filetypes=STRUCTURE_FILETYPES,
         )
         if not path:
             return
         try:
-            with open(path, "w", encoding="utf-8") as f:
-                f.write(self.structure.to_json())
+            save_structure(self.structure, path)
             self._set_estado(f"Guardado en {path}.")
         except Exception as e:
             self._error(f"Error al guardar: {e}")
@@ -433,14 +482,14 @@ class ExternalBaseContent(BaseContent):
     def on_cargar(self):
         path = fd.askopenfilename(
             title="Cargar estructura",
-            filetypes=[("JSON", "*.json")],
+            filetypes=STRUCTURE_FILETYPES,
         )
         if not path:
             return
         try:
-            with open(path, "r", encoding="utf-8") as f:
-                data: Dict[str, object] = json.load(f)
-            struct = self.structure_cls.from_dict(data)  # type: ignore[arg-type]
+            data: Dict[str, object] = load_data(path)
+            struct = self.structure_cls.from_dict(data, trusted=True)  # type: ignore[arg-type]
+            struct.set_buffer_blocks(int((self.var_buffer.get() or "0").strip()))
         except Exception as e:
             self._error(f"Error al cargar: {e}")
             return
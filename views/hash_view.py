@@ -1,14 +1,15 @@
 from __future__ import annotations
 
 import customtkinter as ctk
-import json
 import math
 import tkinter.filedialog as fd
 import tkinter.messagebox as mb
 from typing import Optional
 
-from .base import BaseContent
+from .base import STRUCTURE_FILETYPES, BaseContent, confirm_generate, visible_range
+from models.common import MAX_CAPACITY
 from models.hash import HashStructure, TOMBSTONE
+from models.persistence import load_data, save_structure
 
 
 HASH_FUNCS = [
@@ -24,6 +25,8 @@ COLLISION_STRATEGIES = [
     ("cuadrado", "Cuadrado"),
     ("anidados", "Arreglos anidados"),
     ("encadenamiento", "Encadenamiento"),
+    ("robinhood", "Robin Hood"),
+    ("cuckoo", "Cuckoo"),
 ]
 
 
@@ -41,6 +44,7 @@ class HashContent(BaseContent):
         self.var_gen_count = ctk.StringVar(value="100")
         self.var_hf = ctk.StringVar(value="")
         self.var_coll = ctk.StringVar(value="")
+        self.var_resize = ctk.BooleanVar(value=False)
 
         # Layout
         self.body.grid_columnconfigure(0, weight=1)
@@ -61,13 +65,15 @@ class HashContent(BaseContent):
         self.coll_menu = ctk.CTkOptionMenu(select_frame, values=[label for _, label in COLLISION_STRATEGIES], variable=self.var_coll)
         self.coll_menu.set("Selecciona...")
         self.coll_menu.grid(row=0, column=3, padx=(0, 16), pady=8)
+        self.chk_resize = ctk.CTkCheckBox(select_frame, text="Redimensionar automaticamente", variable=self.var_resize)
+        self.chk_resize.grid(row=0, column=4, padx=(0, 16), pady=8, sticky="w")
 
         # 1) Configuracion de tamano y longitud + crear/borrar/capacidad
         cfg_frame = ctk.CTkFrame(self.body)
         cfg_frame.grid(row=1, column=0, sticky="ew", padx=8, pady=(4, 4))
         cfg_frame.grid_columnconfigure(6, weight=1)
         ctk.CTkLabel(cfg_frame, text="Tamano (10^n):").grid(row=0, column=0, padx=(8, 6), pady=8, sticky="w")
-        self.exp_menu = ctk.CTkOptionMenu(cfg_frame, values=["1", "2", "3", "4"], variable=self.var_exp)
+        self.exp_menu = ctk.CTkOptionMenu(cfg_frame, values=[str(i) for i in range(1, 8)], variable=self.var_exp)
         self.exp_menu.grid(row=0, column=1, padx=(0, 8), pady=8)
         ctk.CTkLabel(cfg_frame, text="Longitud de clave:").grid(row=0, column=2, padx=(8, 6), pady=8, sticky="w")
         self.klen_menu = ctk.CTkOptionMenu(cfg_frame, values=[str(i) for i in range(1, 10)], variable=self.var_klen)
@@ -94,6 +100,10 @@ class HashContent(BaseContent):
         self.btn_buscar.grid(row=0, column=3, padx=(0, 6), pady=8)
         self.btn_eliminar = ctk.CTkButton(ops_frame, text="Eliminar", command=self.on_eliminar, state="disabled")
         self.btn_eliminar.grid(row=0, column=4, padx=(0, 6), pady=8, sticky="w")
+        self.btn_compactar = ctk.CTkButton(ops_frame, text="Compactar", command=self.on_compactar, state="disabled")
+        self.btn_compactar.grid(row=0, column=5, padx=(0, 6), pady=8, sticky="w")
+        self.btn_stats = ctk.CTkButton(ops_frame, text="Estadisticas", command=self.on_estadisticas, state="disabled")
+        self.btn_stats.grid(row=0, column=6, padx=(0, 6), pady=8, sticky="w")
 
         # 3) Generacion aleatoria
         gen_frame = ctk.CTkFrame(self.body)
@@ -139,6 +149,8 @@ class HashContent(BaseContent):
         self.btn_insert.configure(state=base)
         self.btn_buscar.configure(state=base)
         self.btn_eliminar.configure(state=base)
+        self.btn_compactar.configure(state=base)
+        self.btn_stats.configure(state=base)
         self.btn_guardar.configure(state=base)
         self.btn_generar.configure(state=base)
 
@@ -148,55 +160,79 @@ class HashContent(BaseContent):
         self.klen_menu.configure(state=state)
         self.hf_menu.configure(state=state)
         self.coll_menu.configure(state=state)
+        self.chk_resize.configure(state=state)
         self.btn_crear.configure(state=state)
         self.btn_borrar.configure(state="normal" if not enabled else "disabled")
 
     def _update_counters(self):
-        cap = self.structure.capacity if self.structure else 0
-        occ = self.structure.size if self.structure else 0
-        self.lbl_capacidad.configure(text=f"Capacidad: {cap} | Ocupados: {occ}")
+        if not self.structure:
+            self.lbl_capacidad.configure(text="Capacidad: - | Ocupados: 0")
+            return
+        s = self.structure
+        text = f"Capacidad: {s.capacity} | Ocupados: {s.size} | Carga: {s.load_factor:.2f}"
+        if s.tombstones:
+            text += f" | Borrados: {s.tombstones}"
+        if s.resizing:
+            text += f" | Migrando: {s.pending_migration} pos."
+        self.lbl_capacidad.configure(text=text)
 
     def _refresh_view(self, highlight_index: int | None = None):
         self.viewer.configure(state="normal")
         self.viewer.delete("1.0", "end")
         cap = self.structure.capacity if self.structure else 0
         tabla = self.structure.table if self.structure else []
-        mostrar = min(1000, cap)
+        focus = highlight_index if highlight_index is not None and highlight_index < cap else None
+        window = visible_range(cap, 1000, focus)
+        offset = 1 if window.start > 0 else 0
+        highlight_line = None
+        if focus is not None and focus in window:
+            highlight_line = focus - window.start + offset + 1
         if cap == 0:
             self.viewer.insert("end", "Crea o carga la estructura para visualizar contenido.\n")
         else:
             mode = self.structure.collision if self.structure else ""
-            for i in range(mostrar):
-                if mode in {"anidados", "encadenamiento"}:
+            width = max(4, len(str(cap - 1)))
+            lines = []
+            if offset:
+                lines.append(f"... ({window.start} posiciones anteriores no mostradas)")
+            for i in window:
+                if self.structure.chained:  # type: ignore[union-attr]
                     try:
                         items = self.structure.bucket_items(i)  # type: ignore[union-attr]
                     except Exception:
                         items = []
                     if items:
                         joiner = " -> " if mode == "encadenamiento" else ", "
-                        self.viewer.insert("end", f"[{i:>4}]  {joiner.join(str(x) for x in items)}\n")
+                        lines.append(f"[{i:>{width}}]  {joiner.join(str(x) for x in items)}")
                     else:
-                        self.viewer.insert("end", f"[{i:>4}]  -\n")
+                        lines.append(f"[{i:>{width}}]  -")
                     continue
                 val = None
                 if i < len(tabla):
                     val = tabla[i]
                 if isinstance(val, int):
-                    self.viewer.insert("end", f"[{i:>4}]  {val}\n")
+                    lines.append(f"[{i:>{width}}]  {val}")
                 elif val is TOMBSTONE:
-                    self.viewer.insert("end", f"[{i:>4}]  †\n")
+                    lines.append(f"[{i:>{width}}]  †")
                 else:
-                    self.viewer.insert("end", f"[{i:>4}]  -\n")
-            if cap > mostrar:
-                self.viewer.insert("end", f"... ({cap - mostrar} posiciones no mostradas)\n")
+                    lines.append(f"[{i:>{width}}]  -")
+            if cap > window.stop:
+                lines.append(f"... ({cap - window.stop} posiciones no mostradas)")
+            overflow = self.structure.overflow  # type: ignore[union-attr]
+            if overflow:
+                lines.append("Reserva (cuckoo):")
+                for j, val in enumerate(overflow):
+                    if highlight_index == cap + j:
+                        highlight_line = len(lines) + 1
+                    lines.append(f"[R{j:>{width - 1}}]  {val}")
+            self.viewer.insert("end", "\n".join(lines) + "\n")
         try:
             w = getattr(self.viewer, "_textbox", self.viewer)
             w.tag_remove("found", "1.0", "end")
-            if highlight_index is not None and cap > 0 and highlight_index < mostrar:
-                line = highlight_index + 1
-                w.tag_add("found", f"{line}.0", f"{line}.end")
+            if highlight_line is not None:
+                w.tag_add("found", f"{highlight_line}.0", f"{highlight_line}.end")
                 try:
-                    w.see(f"{line}.0")
+                    w.see(f"{highlight_line}.0")
                 except Exception:
                     pass
         except Exception:
@@ -255,7 +291,14 @@ class HashContent(BaseContent):
         hf_key = label_to_key[hf_label]
         coll_key = label_to_c[coll_label]
         try:
-            self.structure = HashStructure(10 ** exp, klen, hf_key, coll_key)
+            self.structure = HashStructure(
+                10 ** exp,
+                klen,
+                hf_key,
+                coll_key,
+                large=10 ** exp > MAX_CAPACITY,
+                auto_resize=bool(self.var_resize.get()),
+            )
         except Exception as e:
             self._error(str(e))
             return
@@ -325,6 +368,34 @@ class HashContent(BaseContent):
         self._update_counters()
         self._refresh_view()
 
+    def on_compactar(self):
+        if not self.structure:
+            self._error("Primero crea o carga la estructura.")
+            return
+        removed = self.structure.compact()
+        self._set_estado(f"Tabla compactada: {removed} marca(s) de borrado eliminada(s).")
+        self._update_counters()
+        self._refresh_view()
+
+    def on_estadisticas(self):
+        if not self.structure:
+            self._error("Primero crea o carga la estructura.")
+            return
+        st = self.structure.stats()
+        ok, miss, skew = st["exitosa"], st["fallida"], st["sesgo"]
+        lines = [
+            f"Claves: {st['claves']}",
+            f"Busqueda exitosa: promedio {ok['promedio']:.2f}, maximo {ok['maximo']} sondeo(s)",
+            f"Busqueda fallida: {miss['busquedas']} consulta(s), promedio {miss['promedio']:.2f}, maximo {miss['maximo']}",
+            f"Sesgo: {skew['posiciones_usadas']} posiciones base usadas, maximo {skew['max_por_posicion']} por posicion, "
+            f"CV {skew['coef_variacion']:.2f}",
+        ]
+        hist = st.get("cadenas", st.get("clusters", {}))
+        label = "Cadenas" if "cadenas" in st else "Clusters"
+        if hist:
+            lines.append(f"{label} (largo: cantidad): " + ", ".join(f"{k}: {v}" for k, v in hist.items()))
+        self._info("\n".join(lines))
+
     def on_guardar(self):
         if not self.structure:
             self._error("No hay estructura creada para guardar.")
@@ -332,13 +403,12 @@ class HashContent(BaseContent):
         path = fd.asksaveasfilename(
             title="Guardar estructura",
             defaultextension=".json",
-            filetypes=[("JSON", "*.json")],
+            filetypes=STRUCTURE_FILETYPES,
         )
         if not path:
             return
         try:
-            with open(path, "w", encoding="utf-8") as f:
-                f.write(self.structure.to_json())
+            save_structure(self.structure, path)
             self._set_estado(f"Guardado en {path}.")
         except Exception as e:
             self._error(f"Error al guardar: {e}")
@@ -346,14 +416,13 @@ class HashContent(BaseContent):
     def on_cargar(self):
         path = fd.askopenfilename(
             title="Cargar estructura",
-            filetypes=[("JSON", "*.json")],
+            filetypes=STRUCTURE_FILETYPES,
         )
         if not path:
             return
         try:
-            with open(path, "r", encoding="utf-8") as f:
-                data = json.load(f)
-            struct = HashStructure.from_dict(data)
+            data = load_data(path)
+            struct = HashStructure.from_dict(data, trusted=True)
         except Exception as e:
             self._error(f"Error al cargar: {e}")
             return
@@ -365,6 +434,7 @@ class HashContent(BaseContent):
         c_to_label = {k: l for k, l in COLLISION_STRATEGIES}
         self.hf_menu.set(key_to_label.get(self.structure.hash_func, self.structure.hash_func))
         self.coll_menu.set(c_to_label.get(self.structure.collision, self.structure.collision))
+        self.var_resize.set(self.structure.auto_resize)
         self._set_config_enabled(False)
         self._set_controls_enabled(True)
         self._update_counters()
@@ -383,6 +453,9 @@ class HashContent(BaseContent):
         if count <= 0:
             self._error("La cantidad debe ser mayor que 0.")
             return
+        # Cada clave se inserta y se mide por separado: ~15 s por millón
+        if not confirm_generate(count, 4):
+            return
         added = self.structure.generate_random(count)
         self._set_estado(f"Generados {added} elementos aleatorios.")
         self._update_counters()
@@ -1,14 +1,15 @@
 from __future__ import annotations
 
 import customtkinter as ctk
-import json
 import math
 import tkinter.filedialog as fd
 import tkinter.messagebox as mb
 from typing import Optional
 
-from .base import BaseContent
+from .base import STRUCTURE_FILETYPES, BaseContent, confirm_generate, visible_range
+from models.common import MAX_CAPACITY
 from models.linear import LinearStructure
+from models.persistence import load_data, save_structure
 
 
 class LinealContent(BaseContent):
@@ -43,7 +44,7 @@ class LinealContent(BaseContent):
         cfg_frame.grid_columnconfigure(6, weight=1)
 
         ctk.CTkLabel(cfg_frame, text="Tamaño (10^n):").grid(row=0, column=0, padx=(8, 6), pady=8, sticky="w")
-        self.exp_menu = ctk.CTkOptionMenu(cfg_frame, values=["1", "2", "3", "4"], variable=self.var_exp)
+        self.exp_menu = ctk.CTkOptionMenu(cfg_frame, values=[str(i) for i in range(1, 8)], variable=self.var_exp)
         self.exp_menu.grid(row=0, column=1, padx=(0, 8), pady=8)
 
         ctk.CTkLabel(cfg_frame, text="Longitud de clave:").grid(row=0, column=2, padx=(8, 6), pady=8, sticky="w")
@@ -176,25 +177,30 @@ class LinealContent(BaseContent):
         self.viewer.delete("1.0", "end")
         cap = self.structure.capacity if self.structure else 0
         items = self.structure.items if self.structure else []
-        mostrar = min(1000, cap)
+        window = visible_range(cap, 1000, highlight_index)
+        offset = 1 if window.start > 0 else 0
         if cap == 0:
             self.viewer.insert("end", "Crea o carga la estructura para visualizar contenido.\n")
         else:
-            for i in range(mostrar):
-                if i < len(items):
-                    val = items[i]
-                    self.viewer.insert("end", f"[{i:>4}]  {val}\n")
-                else:
-                    self.viewer.insert("end", f"[{i:>4}]  —\n")
-            if cap > mostrar:
-                self.viewer.insert("end", f"... ({cap - mostrar} elementos no mostrados)\n")
+            # Se arma el texto completo y se inserta una sola vez
+            width = max(4, len(str(cap - 1)))
+            lines = []
+            if offset:
+                lines.append(f"... ({window.start} elementos anteriores no mostrados)")
+            shown = items[window.start:window.stop]
+            for i in window:
+                val = shown[i - window.start] if i - window.start < len(shown) else "—"
+                lines.append(f"[{i:>{width}}]  {val}")
+            if cap > window.stop:
+                lines.append(f"... ({cap - window.stop} elementos no mostrados)")
+            self.viewer.insert("end", "\n".join(lines) + "\n")
         # Highlight after text is present
         try:
             w = getattr(self.viewer, "_textbox", self.viewer)
             w.tag_remove("scan", "1.0", "end")
             w.tag_remove("found", "1.0", "end")
-            if highlight_index is not None and cap > 0 and highlight_index < mostrar:
-                line = highlight_index + 1
+            if highlight_index is not None and cap > 0 and highlight_index in window:
+                line = highlight_index - window.start + offset + 1
                 tag = "found" if found else "scan"
                 w.tag_add(tag, f"{line}.0", f"{line}.end")
                 try:
@@ -243,7 +249,7 @@ class LinealContent(BaseContent):
             self._error("Parámetros inválidos")
             return
         try:
-            self.structure = LinearStructure(10 ** exp, klen)
+            self.structure = LinearStructure(10 ** exp, klen, large=10 ** exp > MAX_CAPACITY)
         except Exception as e:
             self._error(str(e))
             return
@@ -285,12 +291,12 @@ class LinealContent(BaseContent):
         if not ok:
             self._error(err or "")
             return
-        idx = self.structure.find(val)  # type: ignore[union-attr]
+        idx, comparisons = self.structure.linear_search(val)  # type: ignore[union-attr]
         if idx == -1:
-            self._set_estado(f"{val} no encontrado.")
+            self._set_estado(f"{val} no encontrado ({comparisons} comparaciones).")
             self._refresh_view()
         else:
-            self._set_estado(f"{val} encontrado en índice {idx}.")
+            self._set_estado(f"{val} encontrado en índice {idx} ({comparisons} comparaciones).")
             self._refresh_view(highlight_index=idx, found=True)
 
     def on_eliminar(self):
@@ -314,13 +320,12 @@ class LinealContent(BaseContent):
         path = fd.asksaveasfilename(
             title="Guardar estructura",
             defaultextension=".json",
-            filetypes=[("JSON", "*.json")],
+            filetypes=STRUCTURE_FILETYPES,
         )
         if not path:
             return
         try:
-            with open(path, "w", encoding="utf-8") as f:
-                f.write(self.structure.to_json())
+            save_structure(self.structure, path)
             self._set_estado(f"Guardado en {path}.")
         except Exception as e:
             self._error(f"Error al guardar: {e}")
@@ -328,14 +333,13 @@ class LinealContent(BaseContent):
     def on_cargar(self):
         path = fd.askopenfilename(
             title="Cargar estructura",
-            filetypes=[("JSON", "*.json")],
+            filetypes=STRUCTURE_FILETYPES,
         )
         if not path:
             return
         try:
-            with open(path, "r", encoding="utf-8") as f:
-                data = json.load(f)
-            struct = LinearStructure.from_dict(data)
+            data = load_data(path)
+            struct = LinearStructure.from_dict(data, trusted=True)
         except Exception as e:
             self._error(f"Error al cargar: {e}")
             return
@@ -362,6 +366,9 @@ class LinealContent(BaseContent):
         if count <= 0:
             self._error("La cantidad debe ser mayor que 0.")
             return
+        # ~2 s por millón, casi todo en construir el índice
+        if not confirm_generate(count, 2):
+            return
         added = self.structure.generate_random(count)
         self._set_estado(f"Generados {added} elementos aleatorios.")
         self._update_counters()